@@ -0,0 +1,380 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+
+from reviews.models import Category, Genre, Title
+
+KINDS = ("titles", "genres", "categories")
+
+
+def normalize(value):
+    return value.casefold().replace("ё", "е")
+
+
+def name_keys(name):
+    """
+    Ключи индекса для названия: само название и каждый его хвост,
+    начинающийся со слова, чтобы префикс находил и слова из середины.
+    """
+    name = normalize(name)
+    return {name[match.start():] for match in re.finditer(r"\w+", name)}
+
+
+def prefix_end(prefix):
+    """
+    Наименьшая строка, которая больше всех строк, начинающихся с prefix.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class IndexData:
+    """
+    Данные префиксного индекса.
+
+    Для каждого типа ключи (ключ, id) хранятся в отсортированном списке.
+    Для префиксов, которым соответствует больше AUTOCOMPLETE_SCAN_LIMIT
+    ключей, хранятся первые AUTOCOMPLETE_MAX_LIMIT записей по убыванию
+    рейтинга; списки поддерживаются при каждом изменении, поэтому поиск
+    по частому префиксу не просматривает все совпадения.
+    """
+
+    def __init__(self):
+        self.keys = {kind: [] for kind in KINDS}
+        self.items = {}
+        self.top = {}
+
+    @classmethod
+    def from_database(cls):
+        """
+        Читает названия из базы и сортирует ключи один раз.
+        """
+        data = cls()
+        for pk, name, year, rating, category_id in (
+            Title.objects.values_list(
+                "pk", "name", "year", "rating", "category_id"
+            ).iterator()
+        ):
+            data.load(
+                "titles",
+                pk,
+                name,
+                {"id": pk, "name": name, "year": year, "rating": rating},
+                rating or 0,
+                category_id=category_id,
+            )
+        for kind, model in (("genres", Genre), ("categories", Category)):
+            for pk, name, slug, titles in model.objects.annotate(
+                titles_count=Count("titles")
+            ).values_list("pk", "name", "slug", "titles_count"):
+                data.load(kind, pk, name, {"name": name, "slug": slug}, titles)
+        for keys in data.keys.values():
+            keys.sort()
+        data.warm(settings.AUTOCOMPLETE_WARM_PREFIX_LENGTH)
+        return data
+
+    def load(self, kind, pk, name, payload, score, **extra):
+        keys = name_keys(name)
+        self.items[(kind, pk)] = dict(
+            payload=payload, score=score, keys=keys, **extra
+        )
+        self.keys[kind].extend((key, pk) for key in keys)
+
+    def warm(self, length):
+        """
+        Заранее считает первые места для частых префиксов длиной до
+        length символов.
+        """
+        for kind, keys in self.keys.items():
+            for size in range(1, length + 1):
+                position = 0
+                while position < len(keys):
+                    prefix = keys[position][0][:size]
+                    if len(prefix) < size:
+                        position += 1
+                        continue
+                    end = bisect_left(keys, (prefix_end(prefix),))
+                    if end - position > settings.AUTOCOMPLETE_SCAN_LIMIT:
+                        self.top[(kind, prefix)] = self.rank(
+                            kind, keys[position:end]
+                        )
+                    position = end
+
+    def sort_key(self, kind, pk):
+        return (-self.items[(kind, pk)]["score"], pk)
+
+    def rank(self, kind, keys, limit=None):
+        return heapq.nsmallest(
+            limit or settings.AUTOCOMPLETE_MAX_LIMIT,
+            (self.sort_key(kind, pk) for pk in {pk for _, pk in keys}),
+        )
+
+    def cached_prefixes(self, kind, keys):
+        return {
+            key[:size]
+            for key in keys
+            for size in range(1, len(key) + 1)
+            if (kind, key[:size]) in self.top
+        }
+
+    def rerank(self, kind, pk, keys):
+        """
+        Обновляет списки первых мест после изменения записи.
+
+        Список короче AUTOCOMPLETE_MAX_LIMIT содержит все совпадения.
+        В полном списке записи вне его хуже последней, поэтому запись,
+        опустившаяся ниже последней или исчезнувшая, требует пересчёта:
+        такой список удаляется и строится заново при следующем поиске.
+        """
+        item = self.items.get((kind, pk))
+        limit = settings.AUTOCOMPLETE_MAX_LIMIT
+        for prefix in self.cached_prefixes(kind, keys):
+            top = self.top[(kind, prefix)]
+            complete = len(top) < limit
+            last = top[-1] if top else None
+            member = [entry for entry in top if entry[1] == pk]
+            if member:
+                top.remove(member[0])
+            if item is None or not any(
+                key.startswith(prefix) for key in item["keys"]
+            ):
+                if member and not complete:
+                    del self.top[(kind, prefix)]
+                continue
+            entry = self.sort_key(kind, pk)
+            if complete or entry <= last:
+                insort(top, entry)
+                del top[limit:]
+            elif member:
+                del self.top[(kind, prefix)]
+
+    def put(self, kind, pk, name, payload, score, **extra):
+        previous = self.remove(kind, pk, rerank=False)
+        keys = name_keys(name)
+        self.items[(kind, pk)] = dict(
+            payload=payload, score=score, keys=keys, **extra
+        )
+        for key in keys:
+            insort(self.keys[kind], (key, pk))
+        self.rerank(kind, pk, keys | (previous["keys"] if previous else set()))
+        return previous
+
+    def remove(self, kind, pk, rerank=True):
+        item = self.items.pop((kind, pk), None)
+        if item is None:
+            return None
+        keys = self.keys[kind]
+        for key in item["keys"]:
+            position = bisect_left(keys, (key, pk))
+            if position < len(keys) and keys[position] == (key, pk):
+                del keys[position]
+        if rerank:
+            self.rerank(kind, pk, item["keys"])
+        return item
+
+    def set_score(self, kind, pk, score):
+        item = self.items.get((kind, pk))
+        if item is not None:
+            item["score"] = score
+            self.rerank(kind, pk, item["keys"])
+        return item
+
+    def shift_score(self, kind, pk, delta):
+        item = self.items.get((kind, pk))
+        if item is not None:
+            self.set_score(kind, pk, item["score"] + delta)
+
+    def search(self, query, limit):
+        found = {}
+        for kind, keys in self.keys.items():
+            start = bisect_left(keys, (query,))
+            end = bisect_left(keys, (prefix_end(query),))
+            if end - start <= settings.AUTOCOMPLETE_SCAN_LIMIT:
+                top = self.rank(kind, keys[start:end], limit)
+            else:
+                top = self.top.get((kind, query))
+                if top is None:
+                    top = self.top[(kind, query)] = self.rank(
+                        kind, keys[start:end]
+                    )
+            found[kind] = [
+                self.items[(kind, pk)]["payload"] for _, pk in top[:limit]
+            ]
+        return found
+
+
+class PrefixIndex:
+    """
+    Префиксный индекс названий произведений, жанров и категорий.
+
+    Индекс строится при первом обращении, обновляется сигналами и раз в
+    AUTOCOMPLETE_REFRESH_INTERVAL секунд перестраивается в фоновом
+    потоке, чтобы подхватить изменения из других процессов. Изменения
+    применяются после фиксации транзакции. Новые данные
+    строятся без блокировки и подменяются целиком; изменения, пришедшие
+    во время построения, применяются к ним повторно.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.generation = 0
+        self.refreshing = False
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.data = None
+            self.pending = None
+            self.built_at = None
+            self.generation += 1
+
+    @property
+    def tracking(self):
+        """
+        True, если изменения нужно передавать индексу.
+        """
+        return self.data is not None or self.pending is not None
+
+    def build(self, only_if_missing=False):
+        with self.build_lock:
+            with self.lock:
+                if only_if_missing and self.data is not None:
+                    return
+                generation = self.generation
+                self.pending = []
+            try:
+                data = IndexData.from_database()
+            except Exception:
+                with self.lock:
+                    if self.generation == generation:
+                        self.pending = None
+                raise
+            with self.lock:
+                if self.generation != generation:
+                    return
+                for change in self.pending:
+                    change(data)
+                self.data = data
+                self.pending = None
+                self.built_at = time.monotonic()
+
+    def refresh(self):
+        try:
+            self.build()
+        finally:
+            self.refreshing = False
+            connection.close()
+
+    def ensure_built(self):
+        """
+        Строит индекс при первом обращении и запускает фоновое
+        обновление устаревшего индекса, продолжая отвечать из старого.
+        """
+        with self.lock:
+            if self.data is not None:
+                if (
+                    not self.refreshing
+                    and time.monotonic() - self.built_at
+                    > settings.AUTOCOMPLETE_REFRESH_INTERVAL
+                ):
+                    self.refreshing = True
+                    threading.Thread(target=self.refresh, daemon=True).start()
+                return
+        self.build(only_if_missing=True)
+
+    def apply(self, change):
+        """
+        Применяет изменение после фиксации текущей транзакции, чтобы
+        откаченные записи не попадали в индекс.
+        """
+
+        def commit():
+            with self.lock:
+                if self.data is not None:
+                    change(self.data)
+                if self.pending is not None:
+                    self.pending.append(change)
+
+        transaction.on_commit(commit)
+
+    def search(self, query, limit):
+        """
+        Возвращает для каждого типа до limit записей с названием,
+        начинающимся (по словам) с query, по убыванию рейтинга или
+        числа произведений.
+        """
+        query = normalize(query.strip())
+        if not query:
+            return {kind: [] for kind in KINDS}
+        self.ensure_built()
+        with self.lock:
+            return self.data.search(query, limit)
+
+    def update_title(self, title):
+        pk, name, year = title.pk, title.name, title.year
+        rating, category_id = title.rating, title.category_id
+
+        def change(data):
+            previous = data.put(
+                "titles",
+                pk,
+                name,
+                {"id": pk, "name": name, "year": year, "rating": rating},
+                rating or 0,
+                category_id=category_id,
+            )
+            if previous is None:
+                data.shift_score("categories", category_id, 1)
+            elif previous["category_id"] != category_id:
+                data.shift_score("categories", previous["category_id"], -1)
+                data.shift_score("categories", category_id, 1)
+
+        self.apply(change)
+
+    def update_title_rating(self, pk, rating):
+        def change(data):
+            item = data.set_score("titles", pk, rating or 0)
+            if item is not None:
+                item["payload"]["rating"] = rating
+
+        self.apply(change)
+
+    def remove_title(self, title):
+        pk, category_id = title.pk, title.category_id
+
+        def change(data):
+            if data.remove("titles", pk) is not None:
+                data.shift_score("categories", category_id, -1)
+
+        self.apply(change)
+
+    def update_catalogue(self, kind, obj):
+        pk, name, slug = obj.pk, obj.name, obj.slug
+
+        def change(data):
+            previous = data.items.get((kind, pk))
+            data.put(
+                kind,
+                pk,
+                name,
+                {"name": name, "slug": slug},
+                previous["score"] if previous else 0,
+            )
+
+        self.apply(change)
+
+    def remove_catalogue(self, kind, obj):
+        pk = obj.pk
+        self.apply(lambda data: data.remove(kind, pk))
+
+    def shift_genre_titles(self, genre_id, delta):
+        self.apply(lambda data: data.shift_score("genres", genre_id, delta))
+
+
+index = PrefixIndex()
@@ -0,0 +1,235 @@
+import time
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from api.autocomplete import index as autocomplete_index
+from api.cache import (bump_versions, clear_slug_caches, get_slug_cache,
+                       invalidate_titles, reviews_version)
+from api.serializers import TitleWriteSerializer
+from reviews.leaderboards import refresh_title_leaderboards
+from reviews.models import Category, Genre, Title, TitleGenre
+from reviews.similarity import enqueue_similar_titles
+
+TITLE_FIELDS = ("name", "year", "description", "category")
+
+
+def chunked(items, size):
+    items = iter(enumerate(items))
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def prefetch_slugs(items):
+    """
+    Загружает в кэш slug все жанры и категории пачки двумя запросами.
+    """
+    genres, categories = set(), set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if isinstance(item.get("category"), str):
+            categories.add(item["category"])
+        if isinstance(item.get("genre"), list):
+            genres.update(
+                slug for slug in item["genre"] if isinstance(slug, str)
+            )
+    get_slug_cache(Genre).get_many(genres)
+    get_slug_cache(Category).get_many(categories)
+
+
+def validate_chunk(chunk):
+    """
+    Проверяет пачку правилами TitleWriteSerializer.
+
+    Существующие произведения для обновления читаются одним запросом,
+    slug - из кэша, поэтому проверка самих записей не обращается к базе.
+
+    Returns:
+    - tuple: Список (индекс, произведение или None, данные) для верных
+    записей и словарь ошибок по индексам.
+    """
+    prefetch_slugs(item for _, item in chunk)
+    ids = {
+        item["id"]
+        for _, item in chunk
+        if isinstance(item, dict) and isinstance(item.get("id"), int)
+    }
+    existing = Title.objects.in_bulk(ids)
+    valid, errors = [], {}
+    for index, item in chunk:
+        if not isinstance(item, dict):
+            errors[index] = {"non_field_errors": ["Expected an object"]}
+            continue
+        instance = None
+        if "id" in item:
+            instance = existing.get(item["id"])
+            if instance is None:
+                errors[index] = {"id": ["Title not found"]}
+                continue
+        serializer = TitleWriteSerializer(
+            instance, data=item, partial=instance is not None
+        )
+        if serializer.is_valid():
+            valid.append((index, instance, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+    return valid, errors
+
+
+def write_chunk(valid):
+    """
+    Записывает проверенную пачку в одной транзакции.
+
+    Новые произведения сохраняются по одному (SQLite в Django 3.2 не
+    возвращает id из bulk_create), изменённые - одним bulk_update, связи
+    с жанрами - одним bulk_create и одним DELETE. Сигналы bulk-операций
+    не отправляются, поэтому кэши и индексы обновляются здесь явно.
+
+    Returns:
+    - list: Пары (индекс, произведение, создано ли оно).
+    """
+    written = []
+    updated_fields = set()
+    genre_changes = {}
+    with transaction.atomic():
+        for index, instance, data in valid:
+            data = dict(data)
+            genres = data.pop("genre", None)
+            created = instance is None
+            if created:
+                instance = Title(**data)
+                instance.save()
+            else:
+                for field, value in data.items():
+                    setattr(instance, field, value)
+                updated_fields.update(data)
+            if genres is not None:
+                genre_changes[instance.pk] = {genre.pk for genre in genres}
+            written.append((index, instance, created))
+        updated = [title for _, title, created in written if not created]
+        if updated and updated_fields:
+            Title.objects.bulk_update(
+                updated, [field for field in TITLE_FIELDS
+                          if field in updated_fields]
+            )
+        added, removed = replace_genres(genre_changes)
+    titles_changed([title for _, title, _ in written], added, removed)
+    return written
+
+
+def replace_genres(genre_changes):
+    """
+    Приводит жанры произведений к заданным наборам.
+
+    Returns:
+    - tuple: Добавленные и удалённые пары (id произведения, id жанра).
+    """
+    current = {
+        (title_id, genre_id): pk
+        for pk, title_id, genre_id in TitleGenre.objects.filter(
+            title_id__in=genre_changes
+        ).values_list("pk", "title_id", "genre_id")
+    }
+    wanted = {
+        (title_id, genre_id)
+        for title_id, genre_ids in genre_changes.items()
+        for genre_id in genre_ids
+    }
+    removed = current.keys() - wanted
+    added = wanted - current.keys()
+    if removed:
+        TitleGenre.objects.filter(
+            pk__in=[current[pair] for pair in removed]
+        ).delete()
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title_id_id=title_id, genre_id_id=genre_id)
+        for title_id, genre_id in added
+    )
+    return added, removed
+
+
+def titles_changed(titles, added, removed):
+    """
+    Обновляет кэши, подсказки и рейтинги после записи пачки и ставит в
+    очередь пересчёт похожих произведений.
+
+    Удаление связей с жанрами отправляет post_delete, и подсказки жанров
+    уменьшаются сигналом; добавленные bulk_create связи учитываются
+    здесь.
+    """
+    ids = [title.pk for title in titles]
+    invalidate_titles(ids)
+    bump_versions([reviews_version(pk) for pk in ids])
+    for title in titles:
+        autocomplete_index.update_title(title)
+    for _, genre_id in added:
+        autocomplete_index.shift_genre_titles(genre_id, 1)
+    refresh_title_leaderboards(ids)
+    enqueue_similar_titles(title_id for title_id, _ in added | removed)
+
+
+def upsert_chunk(chunk):
+    """
+    Проверяет и записывает пачку.
+
+    Кэш slug процесса мог вернуть жанр или категорию, удалённые в другом
+    процессе, и тогда запись нарушает внешний ключ. В этом случае кэши
+    сбрасываются и пачка проверяется заново по базе: записи с
+    удалёнными slug получают ту же ошибку поля, что и при обычной
+    проверке, а остальные записываются повторно.
+
+    Returns:
+    - tuple: Записанные пары (индекс, произведение, создано ли оно) и
+    словарь ошибок по индексам.
+    """
+    valid, errors = validate_chunk(chunk)
+    try:
+        return write_chunk(valid), errors
+    except IntegrityError:
+        clear_slug_caches()
+    valid, errors = validate_chunk(chunk)
+    try:
+        return write_chunk(valid), errors
+    except IntegrityError as error:
+        for index, _, _ in valid:
+            errors[index] = {"non_field_errors": [str(error)]}
+        return [], errors
+
+
+def bulk_upsert_titles(items, chunk_size):
+    """
+    Создаёт и изменяет произведения пачками по chunk_size.
+
+    Записи с `id` изменяются (как PATCH), без `id` - создаются. Ошибки
+    отдельных записей не прерывают пачку; если запись пачки нарушила
+    ограничение базы не из-за устаревшего кэша slug, пачка откатывается
+    целиком и её записи помечаются ошибочными.
+
+    Returns:
+    - dict: Результаты по каждой записи и статистика загрузки.
+    """
+    started = time.monotonic()
+    results = [None] * len(items)
+    for chunk in chunked(items, chunk_size):
+        written, errors = upsert_chunk(chunk)
+        for index, item_errors in errors.items():
+            results[index] = {"status": "error", "errors": item_errors}
+        for index, title, created in written:
+            results[index] = {
+                "status": "created" if created else "updated",
+                "id": title.pk,
+            }
+    elapsed = time.monotonic() - started
+    statuses = [result["status"] for result in results]
+    return {
+        "created": statuses.count("created"),
+        "updated": statuses.count("updated"),
+        "errors": statuses.count("error"),
+        "seconds": round(elapsed, 3),
+        "titles_per_second": round(len(items) / max(elapsed, 1e-6)),
+        "results": results,
+    }
@@ -0,0 +1,238 @@
+import threading
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from reviews.models import Category, Genre, ResourceVersion
+
+DATA_VERSION = "data"
+
+
+def now_version():
+    return time.time_ns() // 1000
+
+
+def get_versions(names):
+    """
+    Возвращает версии ресурсов одним запросом к базе.
+
+    Версия ресурса, который ещё не менялся, равна 0.
+
+    Returns:
+    - dict: Версии по именам ресурсов.
+    """
+    versions = dict.fromkeys(names, 0)
+    versions.update(
+        ResourceVersion.objects.filter(name__in=versions).values_list(
+            "name", "version"
+        )
+    )
+    return versions
+
+
+def versions_digest(versions):
+    return md5(
+        ",".join(
+            f"{name}:{version}" for name, version in sorted(versions.items())
+        ).encode()
+    ).hexdigest()
+
+
+def bump_versions(names):
+    """
+    Делает недействительными ETag и записи кэша ресурсов, продвигая их
+    версии в базе.
+
+    Версии меняются в текущей транзакции: до её фиксации другие процессы
+    видят старую версию вместе со старыми данными, после - новую.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return
+    now = now_version()
+    ResourceVersion.objects.bulk_create(
+        [ResourceVersion(name=name, version=now) for name in names],
+        ignore_conflicts=True,
+    )
+    ResourceVersion.objects.filter(name__in=names).update(
+        version=Greatest(F("version") + 1, Value(now))
+    )
+
+
+def bump_version(name):
+    bump_versions([name])
+
+
+def request_cache_key(names, request):
+    """
+    Ключ ответа на GET-запрос с учётом версий ресурсов и параметров
+    запроса.
+    """
+    path = md5(request.get_full_path().encode()).hexdigest()
+    digest = versions_digest(get_versions([*names, DATA_VERSION]))
+    return f"response:{digest}:{path}"
+
+
+def catalogue_name(model):
+    return f"catalogue:{model._meta.label_lower}"
+
+
+def incr_counter(key):
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+TITLES_VERSION = "titles"
+
+
+def title_cache_key(pk):
+    return f"title:{pk}"
+
+
+def title_version_names(pk=None):
+    """
+    Имена версий, от которых зависит ответ со списком произведений или,
+    если передан pk, с одним произведением.
+
+    Названия жанров и категорий входят в ответ, поэтому их изменение
+    продвигает одну версию справочника, а не версии всех его
+    произведений.
+    """
+    return [
+        TITLES_VERSION if pk is None else title_cache_key(pk),
+        catalogue_name(Genre),
+        catalogue_name(Category),
+    ]
+
+
+def invalidate_titles(ids):
+    """
+    Продвигает версии произведений с указанными id и списка
+    произведений.
+
+    Версии входят в ETag и в ключи кэша ответов, поэтому старые записи
+    кэша больше не читаются и вытесняются по TITLE_CACHE_TIMEOUT.
+    """
+    bump_versions([TITLES_VERSION] + [title_cache_key(pk) for pk in ids])
+
+
+def record_title_cache(hit):
+    incr_counter("title-cache:hits" if hit else "title-cache:misses")
+
+
+def title_cache_stats():
+    """
+    Возвращает число попаданий, промахов и долю попаданий кэша
+    произведений.
+    """
+    hits = cache.get("title-cache:hits", 0)
+    misses = cache.get("title-cache:misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else None,
+    }
+
+
+def is_shared_cache():
+    """
+    Возвращает False, если кэш по умолчанию виден только своему процессу.
+    """
+    return not isinstance(
+        caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache)
+    )
+
+
+def reset_title_cache_stats():
+    cache.delete_many(["title-cache:hits", "title-cache:misses"])
+
+
+def reviews_version(title_id):
+    return f"reviews:{title_id}"
+
+
+def comments_version(review_id):
+    return f"comments:{review_id}"
+
+
+class SlugCache:
+    """
+    Кэш процесса slug -> (id, name) для справочника.
+
+    Записи живут SLUG_CACHE_TIMEOUT секунд и сбрасываются сигналами при
+    любом изменении справочника в этом процессе; время жизни ограничивает
+    устаревание после изменений в других процессах.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+
+    def get_many(self, slugs):
+        """
+        Возвращает объекты справочника по slug, запрашивая отсутствующие
+        в кэше одним запросом slug__in.
+
+        Объекты создаются через Model.from_db и не загружаются из базы
+        повторно.
+
+        Returns:
+        - dict: Объекты найденных slug.
+        """
+        now = time.monotonic()
+        found = {}
+        with self.lock:
+            for slug in slugs:
+                entry = self.entries.get(slug)
+                if entry is not None and entry[0] > now:
+                    found[slug] = entry[1:]
+        missing = set(slugs) - found.keys()
+        if missing:
+            rows = (
+                self.model.objects.filter(slug__in=missing)
+                .order_by()
+                .values_list("slug", "pk", "name")
+            )
+            expires = now + settings.SLUG_CACHE_TIMEOUT
+            loaded = {slug: (pk, name) for slug, pk, name in rows}
+            with self.lock:
+                for slug, entry in loaded.items():
+                    self.entries[slug] = (expires, *entry)
+            found.update(loaded)
+        db = router.db_for_read(self.model)
+        return {
+            slug: self.model.from_db(
+                db, ("id", "name", "slug"), (pk, name, slug)
+            )
+            for slug, (pk, name) in found.items()
+        }
+
+
+slug_caches = {}
+
+
+def get_slug_cache(model):
+    if model not in slug_caches:
+        slug_caches.setdefault(model, SlugCache(model))
+    return slug_caches[model]
+
+
+def clear_slug_caches():
+    for slug_cache in slug_caches.values():
+        slug_cache.clear()
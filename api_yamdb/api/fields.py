@@ -0,0 +1,60 @@
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from api.cache import get_slug_cache
+
+
+class CachedSlugManyRelatedField(ManyRelatedField):
+    """
+    Список slug, разрешаемый одним запросом на весь список.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.to_internal_value_many(data)
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Поле справочника по slug с кэшем процесса.
+
+    Одиночное значение и список (`many=True`) разрешаются через
+    SlugCache: при прогретом кэше без запросов, иначе одним запросом
+    slug__in.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("slug_field", "slug")
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return CachedSlugManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        return self.to_internal_value_many([data])[0]
+
+    def to_internal_value_many(self, data):
+        """
+        Возвращает объекты для списка slug без повторов, в порядке списка.
+        """
+        slugs = []
+        for slug in data:
+            if not isinstance(slug, str):
+                self.fail("invalid")
+            if slug not in slugs:
+                slugs.append(slug)
+        objs = get_slug_cache(self.get_queryset().model).get_many(slugs)
+        for slug in slugs:
+            if slug not in objs:
+                self.fail(
+                    "does_not_exist", slug_name=self.slug_field, value=slug
+                )
+        return [objs[slug] for slug in slugs]
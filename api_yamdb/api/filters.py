@@ -1,18 +1,126 @@
+from django.db.models import Count
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
 
-from reviews.models import Title
+from reviews.models import Title, TitleGenre
+from reviews.search import search_titles
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """
+    Фильтр по списку строк, перечисленных через запятую.
+    """
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка с добавлением id, чтобы порядок страниц был однозначным.
+    """
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value in EMPTY_VALUES:
+            return qs
+        return qs.order_by(*qs.query.order_by, "pk")
 
 
 class TitleFilter(filters.FilterSet):
     """
     Фильтр для модели Title.
 
-    Позволяет фильтровать записи по категории, жанру, году и имени.
+    Позволяет фильтровать записи по категории, жанру, году и имени,
+    диапазонам года и рейтинга, списку жанров (`genre__in`, совпадение
+    с любым или, при `genre_match=all`, со всеми), искать по названию и
+    описанию (`search`) и сортировать по рейтингу, взвешенному рейтингу,
+    году и имени (`ordering`).
     """
 
     category = filters.CharFilter(field_name="category__slug")
     genre = filters.CharFilter(field_name="genre__slug")
+    genre__in = CharInFilter(method="filter_genres")
+    genre_match = filters.ChoiceFilter(
+        choices=(("any", "any"), ("all", "all")), method="filter_noop"
+    )
+    year_min = filters.NumberFilter(field_name="year", lookup_expr="gte")
+    year_max = filters.NumberFilter(field_name="year", lookup_expr="lte")
+    rating_min = filters.NumberFilter(field_name="rating", lookup_expr="gte")
+    rating_max = filters.NumberFilter(field_name="rating", lookup_expr="lte")
+    search = filters.CharFilter(method="filter_search")
+    ordering = StableOrderingFilter(
+        fields=("rating", "weighted_rating", "year", "name")
+    )
+
+    facet_fields = {
+        "genre": "genre__slug",
+        "category": "category__slug",
+        "year": "year",
+    }
+    facet_params = {
+        "genre": ("genre", "genre__in", "genre_match"),
+        "category": ("category",),
+        "year": ("year", "year_min", "year_max"),
+    }
 
     class Meta:
-        fields = ("category", "genre", "year", "name")
+        fields = ("category", "genre", "year", "name", "search")
         model = Title
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def filter_noop(self, queryset, name, value):
+        return queryset
+
+    def filter_genres(self, queryset, name, value):
+        """
+        Отбирает произведения с любым или со всеми жанрами из списка.
+
+        Условие строится подзапросом по индексу (genre_id, title_id)
+        таблицы связей, поэтому список не размножает строки выборки.
+        """
+        slugs = set(value)
+        title_ids = TitleGenre.objects.filter(genre_id__slug__in=slugs)
+        if self.data.get("genre_match") == "all":
+            title_ids = (
+                title_ids.order_by()
+                .values("title_id")
+                .annotate(matched=Count("genre_id", distinct=True))
+                .filter(matched=len(slugs))
+            )
+        return queryset.filter(pk__in=title_ids.values("title_id"))
+
+    def facet_counts(self, facets):
+        """
+        Считает число произведений для каждого значения фасетов.
+
+        Фасет учитывает все фильтры запроса, кроме своих собственных,
+        чтобы показывать, сколько записей даст выбор другого значения.
+        На каждый фасет выполняется один сгруппированный запрос.
+
+        Parameters:
+        - facets: Имена фасетов из facet_fields.
+
+        Returns:
+        - dict: Для каждого фасета список {"value", "count"} по убыванию
+        count.
+        """
+        counts = {}
+        for facet in facets:
+            data = self.data.copy()
+            for param in self.facet_params[facet]:
+                data.pop(param, None)
+            queryset = type(self)(
+                data, queryset=self.queryset, request=self.request
+            ).qs
+            field = self.facet_fields[facet]
+            rows = (
+                queryset.filter(**{f"{field}__isnull": False})
+                .order_by()
+                .values(field)
+                .annotate(count=Count("pk", distinct=True))
+                .order_by("-count", field)
+            )
+            counts[facet] = [
+                {"value": row[field], "count": row["count"]} for row in rows
+            ]
+        return counts
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import (is_shared_cache, reset_title_cache_stats,
+                       title_cache_stats)
+
+
+class Command(BaseCommand):
+    help = "Shows hit/miss counters of the title detail cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters"
+        )
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            raise CommandError(
+                "The default cache is local to each process, so the "
+                "counters of the running server are not visible here. "
+                "Configure a shared cache backend or use "
+                "GET /api/v1/cache-stats/titles/."
+            )
+        stats = title_cache_stats()
+        hit_rate = stats["hit_rate"]
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, "
+            "hit rate: "
+            + ("n/a" if hit_rate is None else f"{hit_rate:.2%}")
+        )
+        if options["reset"]:
+            reset_title_cache_stats()
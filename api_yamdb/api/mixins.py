@@ -1,5 +1,16 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import filters, mixins, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
+from api.cache import (DATA_VERSION, catalogue_name, get_versions,
+                       record_title_cache, request_cache_key, title_cache_key,
+                       versions_digest)
 from api.permissions import ReaderOrAdmin
 
 
@@ -13,3 +24,154 @@ class CategoryGenreMixin(
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает список из кэша, заполняя его при промахе.
+
+        Ключ зависит от версии справочника в базе, которую сигналы
+        продвигают при любом изменении записей через API или админку.
+        """
+        key = request_cache_key(
+            [catalogue_name(self.queryset.model)], request
+        )
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.CATALOGUE_CACHE_TIMEOUT)
+        return response
+
+
+class TitleCacheMixin:
+    """
+    Кэширует ответ на запрос произведения по id.
+
+    Используется вместе с ConditionalGetMixin: ключ записи строится из
+    тех же версий, что и ETag.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Возвращает произведение из кэша, заполняя его при промахе.
+
+        Ключ зависит от версий произведения, справочников и общей версии
+        данных, которые продвигают сигналы и команды пересчёта, поэтому
+        изменённое произведение читается из базы заново.
+        """
+        pk = kwargs.get(self.lookup_field, "")
+        if not pk.isdigit():
+            return super().retrieve(request, *args, **kwargs)
+        key = (
+            f"{title_cache_key(int(pk))}:"
+            f"{versions_digest(self.get_versions())}"
+        )
+        data = cache.get(key)
+        record_title_cache(hit=data is not None)
+        if data is not None:
+            return Response(data)
+        response = super().retrieve(request, *args, **kwargs)
+        cache.set(key, response.data, settings.TITLE_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка ETag и Last-Modified для list и retrieve.
+
+    Валидаторы строятся из версий ресурсов ответа (get_version_names) и
+    общей версии DATA_VERSION, которую продвигают команды пересчёта и
+    импорта. Версии хранятся в базе и читаются одним запросом по
+    первичному ключу, поэтому ответ 304 отдаётся без сериализации и
+    одинаков во всех процессах. Без имён версий ответ отдаётся без
+    валидаторов.
+
+    Last-Modified сообщается с точностью до секунды, а версия меняется
+    чаще, поэтому 304 отдаётся только по If-None-Match: изменение в ту же
+    секунду не меняет Last-Modified, и If-Modified-Since вернул бы
+    устаревший ответ.
+    """
+
+    version_names = ()
+    versions = None
+
+    def get_version_names(self):
+        return list(self.version_names)
+
+    def get_versions(self):
+        """
+        Версии ресурсов ответа; читаются из базы один раз за запрос.
+        """
+        if self.versions is None:
+            self.versions = get_versions(
+                [*self.get_version_names(), DATA_VERSION]
+            )
+        return self.versions
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        names = self.get_version_names()
+        if not names:
+            return handler(request, *args, **kwargs)
+        versions = self.get_versions()
+        etag = quote_etag(
+            md5(
+                f"{versions_digest(versions)}:{request.get_full_path()}"
+                .encode()
+            ).hexdigest()
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        response["ETag"] = etag
+        version = max(versions.values())
+        if version:
+            response["Last-Modified"] = http_date(version // 1_000_000)
+        return response
+
+
+class FacetMixin:
+    """
+    Добавляет к списку счётчики фасетов по параметру `?facets=`.
+
+    Фасеты перечисляются через запятую и должны быть описаны в
+    facet_fields класса фильтра.
+    """
+
+    facets_query_param = "facets"
+
+    def get_facets(self, request):
+        value = request.query_params.get(self.facets_query_param, "")
+        facets = [facet for facet in value.split(",") if facet]
+        available = self.filterset_class.facet_fields
+        unknown = [facet for facet in facets if facet not in available]
+        if unknown:
+            raise ValidationError(
+                {
+                    self.facets_query_param: (
+                        f"Unknown facets: {', '.join(unknown)}. "
+                        f"Available: {', '.join(available)}"
+                    )
+                }
+            )
+        return list(dict.fromkeys(facets))
+
+    def list(self, request, *args, **kwargs):
+        facets = self.get_facets(request)
+        response = super().list(request, *args, **kwargs)
+        if facets:
+            filterset = self.filterset_class(
+                request.query_params,
+                queryset=self.get_queryset(),
+                request=request,
+            )
+            response.data["facets"] = filterset.facet_counts(facets)
+        return response
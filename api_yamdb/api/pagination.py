@@ -0,0 +1,135 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PubDateCursorPagination(BasePagination):
+    """
+    Keyset-пагинация по паре (pub_date, id).
+
+    Курсор хранит ключ крайнего объекта страницы, поэтому выборка любой
+    страницы - это диапазонный проход по составному индексу без COUNT(*)
+    и OFFSET.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            queryset = queryset.order_by("-pub_date", "-id")
+        else:
+            queryset = queryset.order_by("pub_date", "id")
+        if position is not None:
+            pub_date, pk = position
+            lookup = "lt" if reverse else "gt"
+            queryset = queryset.filter(
+                Q(**{f"pub_date__{lookup}e": pub_date})
+                & (
+                    Q(**{f"pub_date__{lookup}": pub_date})
+                    | Q(**{f"id__{lookup}": pk})
+                )
+            )
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def decode_cursor(self, request):
+        """
+        Возвращает позицию ((pub_date, id) или None) и направление обхода.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            direction, pub_date, pk = (
+                urlsafe_b64decode(encoded.encode("ascii"))
+                .decode("ascii")
+                .split("|")
+            )
+            position = (parse_datetime(pub_date), int(pk))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None or direction not in ("n", "p"):
+            raise NotFound(self.invalid_cursor_message)
+        return position, direction == "p"
+
+    def encode_cursor(self, instance, reverse):
+        token = "|".join(
+            ("p" if reverse else "n", instance.pub_date.isoformat(),
+             str(instance.pk))
+        )
+        encoded = urlsafe_b64encode(token.encode("ascii")).decode("ascii")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class ReviewCommentPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с включаемым keyset-режимом.
+
+    Режим курсора выбирается параметром `?pagination=cursor` или
+    наличием параметра `cursor` в запросе.
+    """
+
+    mode_query_param = "pagination"
+    cursor_pagination_class = PubDateCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,9 +1,15 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models.signals import m2m_changed
 from rest_framework import serializers
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.cache import get_slug_cache
+from api.fields import CachedSlugRelatedField
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            SimilarTitle, Title, TitleGenre)
+from reviews.ratings import score_distribution
+from reviews.trending import current_score
 
 User = get_user_model()
 
@@ -31,14 +37,13 @@ class CategoriesSerializer(serializers.ModelSerializer):
 class TitleWriteSerializer(serializers.ModelSerializer):
     """
     Сериализатор для записи произведений.
+
+    Жанры и категория разрешаются через кэш slug одним запросом на
+    запрос, связи с жанрами записываются одним bulk_create.
     """
 
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(), slug_field="slug"
-    )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(), slug_field="slug", many=True
-    )
+    category = CachedSlugRelatedField(queryset=Category.objects.all())
+    genre = CachedSlugRelatedField(queryset=Genre.objects.all(), many=True)
 
     class Meta:
         fields = (
@@ -51,6 +56,118 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         )
         model = Title
 
+    def create(self, validated_data):
+        genres = validated_data.pop("genre")
+        try:
+            with transaction.atomic():
+                title = Title.objects.create(**validated_data)
+                self.save_genres(title, genres)
+        except IntegrityError:
+            errors = self.stale_slug_errors(dict(validated_data, genre=genres))
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop("genre", None)
+        try:
+            with transaction.atomic():
+                instance = super().update(instance, validated_data)
+                if genres is not None:
+                    self.save_genres(instance, genres)
+        except IntegrityError:
+            errors = self.stale_slug_errors(
+                dict(validated_data, genre=genres or [])
+            )
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+        return instance
+
+    def stale_slug_errors(self, validated_data):
+        """
+        Разбирает нарушение внешнего ключа после записи.
+
+        Кэш slug процесса мог вернуть жанр или категорию, удалённые в
+        другом процессе. Кэши справочников сбрасываются, и для
+        отсутствующих в базе slug возвращается та же ошибка поля, что и
+        при проверке данных.
+
+        Parameters:
+        - validated_data (dict): Проверенные данные с объектами жанров и
+        категории.
+
+        Returns:
+        - dict: Ошибки по полям; пустой, если все объекты существуют.
+        """
+        errors = {}
+        for name, model in (("category", Category), ("genre", Genre)):
+            get_slug_cache(model).clear()
+            objs = validated_data.get(name)
+            if objs is None:
+                continue
+            if not isinstance(objs, list):
+                objs = [objs]
+            existing = set(
+                model.objects.filter(
+                    pk__in=[obj.pk for obj in objs]
+                ).values_list("pk", flat=True)
+            )
+            field = self.fields[name]
+            field = getattr(field, "child_relation", field)
+            missing = [obj.slug for obj in objs if obj.pk not in existing]
+            if missing:
+                errors[name] = [
+                    field.error_messages["does_not_exist"].format(
+                        slug_name=field.slug_field, value=slug
+                    )
+                    for slug in missing
+                ]
+        return errors
+
+    def save_genres(self, title, genres):
+        """
+        Приводит жанры произведения к списку genres.
+
+        Недостающие связи создаются одним bulk_create, лишние удаляются
+        одним DELETE. Сигналы m2m_changed отправляются так же, как при
+        title.genre.set(), поэтому кэши и индексы обновляются обычным
+        путём.
+        """
+        genre_ids = {genre.pk for genre in genres}
+        current = set(
+            TitleGenre.objects.filter(title_id=title).values_list(
+                "genre_id", flat=True
+            )
+        )
+        removed = current - genre_ids
+        added = genre_ids - current
+        if removed:
+            self.send_genres_changed(title, "pre_remove", removed)
+            TitleGenre.objects.filter(
+                title_id=title, genre_id__in=removed
+            ).delete()
+            self.send_genres_changed(title, "post_remove", removed)
+        if added:
+            self.send_genres_changed(title, "pre_add", added)
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title_id=title, genre_id_id=genre_id)
+                for genre_id in added
+            )
+            self.send_genres_changed(title, "post_add", added)
+
+    def send_genres_changed(self, title, action, genre_ids):
+        m2m_changed.send(
+            sender=Title.genre.through,
+            instance=title,
+            action=action,
+            reverse=False,
+            model=Genre,
+            pk_set=set(genre_ids),
+            using=title._state.db,
+        )
+
     def to_representation(self, instance):
         title = TitleReadSerializer(instance)
         return title.data
@@ -64,6 +181,12 @@ class TitleReadSerializer(serializers.ModelSerializer):
     category = CategoriesSerializer()
     genre = GenresSerializer(many=True)
     rating = serializers.IntegerField(read_only=True, default=0)
+    reviews_count = serializers.IntegerField(
+        source="rating_count", read_only=True
+    )
+    distribution = serializers.SerializerMethodField()
+
+    optional_fields = ("distribution",)
 
     class Meta:
         fields = (
@@ -71,12 +194,68 @@ class TitleReadSerializer(serializers.ModelSerializer):
             "name",
             "year",
             "rating",
+            "reviews_count",
             "description",
             "genre",
             "category",
+            "distribution",
         )
         model = Title
 
+    def get_fields(self):
+        """
+        Убирает необязательные поля, не запрошенные через контекст
+        `optional_fields`.
+        """
+        fields = super().get_fields()
+        requested = self.context.get("optional_fields", ())
+        for name in self.optional_fields:
+            if name not in requested:
+                fields.pop(name)
+        return fields
+
+    def get_distribution(self, obj):
+        return score_distribution(obj)
+
+
+class TitleTrendingSerializer(TitleReadSerializer):
+    """
+    Сериализатор популярных произведений с текущим счётчиком
+    активности.
+    """
+
+    trending = serializers.SerializerMethodField()
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ("trending",)
+
+    def get_trending(self, obj):
+        return current_score(obj.trending_score)
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """
+    Сериализатор позиции произведения в рейтинге.
+    """
+
+    title = TitleReadSerializer()
+
+    class Meta:
+        fields = ("value", "title")
+        model = LeaderboardEntry
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор похожего произведения.
+    """
+
+    title = TitleReadSerializer(source="similar")
+
+    class Meta:
+        fields = ("score", "title")
+        model = SimilarTitle
+
 
 class CommentSerializer(serializers.ModelSerializer):
     """
@@ -109,22 +288,9 @@ class ReviewSerializer(serializers.ModelSerializer):
             "author",
             "score",
             "pub_date",
+            "comments_count",
         )
-
-    def validate(self, data):
-        """
-        Проверяет данные сериализатора.
-        """
-        data = super().validate(data)
-        if self.context["request"].method == "POST":
-            title = get_object_or_404(Title, pk=self.context["title_id"])
-            if Review.objects.filter(
-                title=title, author=self.context["request"].user
-            ).exists():
-                raise serializers.ValidationError(
-                    "You cannot write more than one review on the same title"
-                )
-        return data
+        read_only_fields = ("comments_count",)
 
 
 class UsersSerializer(serializers.ModelSerializer):
@@ -0,0 +1,145 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.autocomplete import index as autocomplete_index
+from api.cache import (DATA_VERSION, bump_version, bump_versions,
+                       catalogue_name, comments_version, get_slug_cache,
+                       invalidate_titles, reviews_version)
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.signals import data_rebuilt
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_catalogue(sender, **kwargs):
+    """
+    Сбрасывает кэш списков и slug категорий и жанров после их изменения.
+    """
+    bump_version(catalogue_name(sender))
+    get_slug_cache(sender).clear()
+
+
+@receiver(data_rebuilt)
+def invalidate_rebuilt_data(sender, **kwargs):
+    """
+    Продвигает общую версию, от которой зависят все ETag и ключи кэша
+    ответов, после массового пересчёта данных.
+    """
+    bump_version(DATA_VERSION)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate_titles([instance.pk])
+    bump_version(reviews_version(instance.pk))
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def invalidate_title_genre(sender, instance, **kwargs):
+    invalidate_titles([instance.title_id_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_titles([instance.pk])
+    elif pk_set:
+        invalidate_titles(pk_set)
+    else:
+        invalidate_titles(instance.titles.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_title(sender, instance, **kwargs):
+    invalidate_titles([instance.title_id])
+    bump_versions(
+        [reviews_version(instance.title_id), comments_version(instance.pk)]
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_review_comments(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш комментариев отзыва и списка отзывов произведения:
+    в ответе отзыва меняется comments_count.
+    """
+    bump_versions(
+        [
+            comments_version(instance.review_id),
+            reviews_version(instance.review.title_id),
+        ]
+    )
+
+
+@receiver(post_save, sender=Title)
+def update_title_autocomplete(sender, instance, **kwargs):
+    autocomplete_index.update_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_autocomplete(sender, instance, **kwargs):
+    autocomplete_index.remove_title(instance)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_rating_autocomplete(sender, instance, **kwargs):
+    if not autocomplete_index.tracking:
+        return
+    autocomplete_index.update_title_rating(
+        instance.title_id,
+        Title.objects.filter(pk=instance.title_id)
+        .values_list("rating", flat=True)
+        .first(),
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def update_catalogue_autocomplete(sender, instance, **kwargs):
+    kind = "genres" if sender is Genre else "categories"
+    autocomplete_index.update_catalogue(kind, instance)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def remove_catalogue_autocomplete(sender, instance, **kwargs):
+    kind = "genres" if sender is Genre else "categories"
+    autocomplete_index.remove_catalogue(kind, instance)
+
+
+@receiver(post_save, sender=TitleGenre)
+def add_title_genre_autocomplete(sender, instance, created, **kwargs):
+    if created:
+        autocomplete_index.shift_genre_titles(instance.genre_id_id, 1)
+
+
+@receiver(post_delete, sender=TitleGenre)
+def remove_title_genre_autocomplete(sender, instance, **kwargs):
+    autocomplete_index.shift_genre_titles(instance.genre_id_id, -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def add_title_genres_autocomplete(sender, action, reverse, pk_set, instance,
+                                  **kwargs):
+    """
+    Учитывает связи, добавленные через title.genre.add(): они создаются
+    bulk_create без post_save. Удаление связей через менеджер отправляет
+    post_delete для каждой связи, поэтому post_remove не обрабатывается.
+    """
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        autocomplete_index.shift_genre_titles(instance.pk, len(pk_set))
+        return
+    for genre_id in pk_set:
+        autocomplete_index.shift_genre_titles(genre_id, 1)
@@ -1,9 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       MyTokenObtainPairView, ReviewViewSet, TitleViewSet,
-                       UserViewSet, user_registration)
+from api.views import (AutocompleteView, CategoryViewSet, CommentViewSet,
+                       ExportView, GenreViewSet, LeaderboardView,
+                       MyTokenObtainPairView, ReviewViewSet,
+                       TitleCacheStatsView, TitleViewSet, UserViewSet,
+                       user_registration)
 
 router_v1 = DefaultRouter()
 router_v1.register("categories", CategoryViewSet, basename="categories")
@@ -26,5 +28,9 @@ auth_urls = [
 
 urlpatterns = [
     path("v1/auth/", include(auth_urls)),
+    path("v1/export/<str:resource>/", ExportView.as_view()),
+    path("v1/cache-stats/titles/", TitleCacheStatsView.as_view()),
+    path("v1/autocomplete/", AutocompleteView.as_view()),
+    path("v1/leaderboards/<str:board>/", LeaderboardView.as_view()),
     path("v1/", include(router_v1.urls)),
 ]
@@ -1,7 +1,44 @@
 from django.db import models
 from django.shortcuts import get_object_or_404
 
+from reviews.models import Review, Title
 
-def get_model_obj(self, model: models.Model, key: str) -> models.Model or None:
-    id = self.kwargs.get(key)
-    return get_object_or_404(model, pk=id)
+
+def get_parent_obj(view, queryset: models.QuerySet,
+                   **lookups: str) -> models.Model:
+    """
+    Возвращает родительский объект вложенного маршрута.
+
+    Вся цепочка идентификаторов из URL проверяется одним запросом, а
+    результат запоминается на экземпляре view, который живёт один запрос,
+    поэтому get_queryset и perform_create не повторяют поиск.
+
+    Parameters:
+    - view: View с аргументами маршрута в kwargs.
+    - queryset: Выборка, в которой ищется объект.
+    - lookups: Соответствие полей модели аргументам маршрута.
+
+    Raises:
+    - Http404: Если объект не найден.
+    """
+    parents = view.__dict__.setdefault("_parent_objs", {})
+    key = (queryset.model, tuple(sorted(lookups.items())))
+    if key not in parents:
+        parents[key] = get_object_or_404(
+            queryset,
+            **{
+                field: view.kwargs.get(kwarg)
+                for field, kwarg in lookups.items()
+            }
+        )
+    return parents[key]
+
+
+def get_title_obj(view) -> Title:
+    return get_parent_obj(view, Title.objects.all(), pk="title_id")
+
+
+def get_review_obj(view) -> Review:
+    return get_parent_obj(
+        view, Review.objects.all(), pk="review_id", title_id="title_id"
+    )
@@ -1,27 +1,42 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from api.autocomplete import index as autocomplete_index
+from api.bulk import bulk_upsert_titles
+from api.cache import (comments_version, reset_title_cache_stats,
+                       reviews_version, title_cache_stats, title_version_names)
 from api.filters import TitleFilter
-from api.mixins import CategoryGenreMixin
+from api.mixins import (CategoryGenreMixin, ConditionalGetMixin, FacetMixin,
+                        TitleCacheMixin)
+from api.pagination import ReviewCommentPagination
+from api.parsers import NDJSONParser
 from api.permissions import AdminAccess, CommentReviewPermission, ReaderOrAdmin
 from api.serializers import (CategoriesSerializer, CommentSerializer,
-                             GenresSerializer, MyTokenObtainPairSerializer,
-                             ReviewSerializer, TitleReadSerializer,
-                             TitleWriteSerializer, UserRegistrationSerializer,
-                             UsersSerializer)
+                             GenresSerializer, LeaderboardEntrySerializer,
+                             MyTokenObtainPairSerializer, ReviewSerializer,
+                             SimilarTitleSerializer, TitleReadSerializer,
+                             TitleTrendingSerializer, TitleWriteSerializer,
+                             UserRegistrationSerializer, UsersSerializer)
 from api.service import send_email
-from api.utils import get_model_obj
-from reviews.models import Category, Genre, Review, Title
+from api.utils import get_review_obj, get_title_obj
+from reviews.exporters import EXPORTS, FORMATS, export_lines
+from reviews.models import (Category, Genre, LeaderboardEntry, SimilarTitle,
+                            Title)
 
 User = get_user_model()
 
@@ -36,9 +51,14 @@ class CategoryViewSet(CategoryGenreMixin):
     serializer_class = CategoriesSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, FacetMixin, TitleCacheMixin,
+                   viewsets.ModelViewSet):
     """
     ViewSet для работы с произведениями.
+
+    Список принимает `?facets=genre,category,year` и возвращает рядом со
+    страницей число произведений для каждого значения фасетов, а
+    `?fields=distribution` добавляет к произведениям распределение оценок.
     """
 
     permission_classes = (ReaderOrAdmin,)
@@ -47,15 +67,118 @@ class TitleViewSet(viewsets.ModelViewSet):
     http_method_names = ("get", "post", "patch", "delete")
 
     def get_queryset(self):
-        return Title.objects.all().annotate(
-            rating=Avg("reviews__score")
-        ).order_by('-name')
+        return (
+            Title.objects.select_related("category")
+            .prefetch_related("genre")
+            .order_by("-name")
+        )
 
     def get_serializer_class(self):
+        if self.action == "trending":
+            return TitleTrendingSerializer
         if self.request.method == "GET":
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_serializer_context(self):
+        """
+        Добавляет в контекст необязательные поля произведения: детальный
+        ответ всегда содержит распределение оценок, списки - по запросу
+        `?fields=distribution`.
+        """
+        context = super().get_serializer_context()
+        fields = set(self.request.query_params.get("fields", "").split(","))
+        if self.action == "retrieve":
+            fields.add("distribution")
+        context["optional_fields"] = fields
+        return context
+
+    def get_version_names(self):
+        if self.action == "retrieve":
+            return title_version_names(self.kwargs[self.lookup_field])
+        return title_version_names()
+
+    @action(detail=False, methods=("get",))
+    def trending(self, request):
+        """
+        Произведения по убыванию затухающей активности отзывов и
+        комментариев.
+
+        Принимает те же фильтры, что и список произведений.
+        """
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .filter(trending_score__isnull=False)
+            .order_by("-trending_score", "pk")
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=("get",))
+    def similar(self, request, pk):
+        """
+        Похожие произведения из предрассчитанного индекса.
+
+        Соседи читаются одним запросом по индексу (title, -score); ещё
+        один запрос проверяет существование произведения, если соседей
+        нет.
+        """
+        if not pk.isdigit():
+            raise NotFound()
+        similar = list(
+            SimilarTitle.objects.filter(title_id=pk)
+            .select_related("similar__category")
+            .prefetch_related("similar__genre")
+            .order_by("-score", "similar_id")
+        )
+        if not similar:
+            get_object_or_404(Title, pk=pk)
+        return Response(
+            {"results": SimilarTitleSerializer(similar, many=True).data}
+        )
+
+    @action(
+        detail=False,
+        methods=("post",),
+        url_path="bulk",
+        permission_classes=(IsAuthenticated, AdminAccess),
+        parser_classes=(JSONParser, NDJSONParser),
+    )
+    def bulk(self, request):
+        """
+        Массово создаёт и изменяет произведения.
+
+        Принимает JSON-массив или NDJSON-поток записей в формате
+        TitleWriteSerializer; записи с `id` изменяются частично. Записи
+        проверяются и сохраняются пачками по BULK_TITLES_CHUNK_SIZE в
+        отдельных транзакциях, в ответе - результат по каждой записи и
+        скорость загрузки.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Expected a list"]}
+            )
+        if len(items) > settings.BULK_TITLES_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Too many items, the limit is "
+                        f"{settings.BULK_TITLES_MAX_ITEMS}"
+                    ]
+                }
+            )
+        result = bulk_upsert_titles(items, settings.BULK_TITLES_CHUNK_SIZE)
+        return Response(
+            result,
+            status=(
+                status.HTTP_201_CREATED
+                if result["created"]
+                else status.HTTP_200_OK
+            ),
+        )
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -96,7 +219,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet для работы с комментариями.
     """
@@ -104,27 +227,28 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (CommentReviewPermission, IsAuthenticatedOrReadOnly)
     http_method_names = ("get", "post", "patch", "delete")
+    pagination_class = ReviewCommentPagination
 
-    def get_review_obj(self):
-        title = get_model_obj(self, Title, "title_id")
-        review_id = self.kwargs.get("review_id")
-        return get_object_or_404(Review, id=review_id, title=title)
+    def get_version_names(self):
+        return [comments_version(self.kwargs.get("review_id"))]
 
     def perform_create(self, serializer):
         """
         Выполняет создание комментария.
         """
 
-        review = self.get_review_obj()
+        review = get_review_obj(self)
         serializer.save(review=review, author=self.request.user)
 
     def get_queryset(self):
 
-        review = self.get_review_obj()
-        return review.comments.all()
+        review = get_review_obj(self)
+        return review.comments.select_related("author").order_by(
+            "pub_date", "id"
+        )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet для работы с отзывами.
     """
@@ -132,27 +256,39 @@ class ReviewViewSet(viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     http_method_names = ("get", "post", "patch", "delete")
     permission_classes = (CommentReviewPermission, IsAuthenticatedOrReadOnly)
+    pagination_class = ReviewCommentPagination
 
-    def get_serializer_context(self):
-        """
-        Возвращает контекст сериализатора.
-        """
-
-        context = super().get_serializer_context()
-        context.update({"title_id": self.kwargs.get("title_id")})
-        return context
+    def get_version_names(self):
+        return [reviews_version(self.kwargs.get("title_id"))]
 
     def perform_create(self, serializer):
         """
         Выполняет создание отзыва.
+
+        Повторный отзыв отсекает ограничение unique_author_title, а не
+        предварительный запрос, поэтому проверка не зависит от гонок
+        параллельных запросов.
         """
 
-        title = get_model_obj(self, Title, "title_id")
-        serializer.save(author=self.request.user, title=title)
+        title = get_title_obj(self)
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "You cannot write more than one review on the "
+                        "same title"
+                    ]
+                }
+            )
 
     def get_queryset(self):
-        title = get_model_obj(self, Title, "title_id")
-        return title.reviews.all()
+        title = get_title_obj(self)
+        return title.reviews.select_related("author").order_by(
+            "pub_date", "id"
+        )
 
 
 @api_view(["POST"])
@@ -198,3 +334,149 @@ class MyTokenObtainPairView(APIView):
             )
         refresh = RefreshToken.for_user(user)
         return Response({"token": str(refresh.access_token)})
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка каталога для администратора.
+
+    Формат задаётся параметром `?type=ndjson|csv` (параметр `format`
+    занят согласованием содержимого DRF).
+    """
+
+    permission_classes = (IsAuthenticated, AdminAccess)
+    content_types = {
+        "ndjson": "application/x-ndjson; charset=utf-8",
+        "csv": "text/csv; charset=utf-8",
+    }
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            raise NotFound(f"Unknown export: {resource}")
+        export_format = request.query_params.get("type", "ndjson")
+        if export_format not in FORMATS:
+            raise ValidationError(
+                {"type": f"Choose one of: {', '.join(FORMATS)}"}
+            )
+        response = StreamingHttpResponse(
+            export_lines(resource, export_format),
+            content_type=self.content_types[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{resource}.{export_format}"'
+        )
+        return response
+
+
+class TitleCacheStatsView(APIView):
+    """
+    Счётчики попаданий и промахов кэша произведений для администратора.
+
+    Счётчики хранятся в кэше по умолчанию; при локальном кэше они видны
+    только процессу, обслуживающему запрос. DELETE обнуляет счётчики.
+    """
+
+    permission_classes = (IsAuthenticated, AdminAccess)
+
+    def get(self, request):
+        return Response(title_cache_stats())
+
+    def delete(self, request):
+        reset_title_cache_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def get_limit(request, default, maximum):
+    """
+    Возвращает значение параметра `limit`, ограниченное сверху.
+    """
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except ValueError:
+        raise ValidationError({"limit": "Must be an integer"})
+    return max(1, min(limit, maximum))
+
+
+class LeaderboardView(APIView):
+    """
+    Первые места рейтинга произведений по средней оценке (`rating`) или
+    числу отзывов (`reviews`).
+
+    Рейтинг ограничивается одним из параметров `genre`, `category`
+    (slug) или `year`. Записи читаются из предрассчитанной таблицы по
+    индексу, поэтому стоимость запроса зависит только от `limit`.
+    """
+
+    scope_models = {
+        LeaderboardEntry.GENRE: Genre,
+        LeaderboardEntry.CATEGORY: Category,
+    }
+
+    def get_scope(self, request):
+        scopes = [
+            scope
+            for scope, _ in LeaderboardEntry.SCOPES
+            if scope in request.query_params
+        ]
+        if not scopes:
+            return LeaderboardEntry.ALL, 0
+        if len(scopes) > 1:
+            raise ValidationError(
+                {"scope": "Use only one of genre, category and year"}
+            )
+        scope = scopes[0]
+        value = request.query_params[scope]
+        if scope == LeaderboardEntry.YEAR:
+            if not value.isdigit():
+                raise ValidationError({"year": "Must be an integer"})
+            return scope, int(value)
+        return scope, get_object_or_404(
+            self.scope_models[scope], slug=value
+        ).pk
+
+    def get(self, request, board):
+        if board not in dict(LeaderboardEntry.BOARDS):
+            raise NotFound(f"Unknown leaderboard: {board}")
+        scope, scope_id = self.get_scope(request)
+        limit = get_limit(
+            request, settings.LEADERBOARD_LIMIT, settings.LEADERBOARD_MAX_LIMIT
+        )
+        entries = (
+            LeaderboardEntry.objects.filter(
+                board=board, scope=scope, scope_id=scope_id
+            )
+            .select_related("title__category")
+            .prefetch_related("title__genre")
+            .order_by("-value", "title_id")[:limit]
+        )
+        return Response(
+            {
+                "results": [
+                    {"rank": rank, **data}
+                    for rank, data in enumerate(
+                        LeaderboardEntrySerializer(entries, many=True).data,
+                        1,
+                    )
+                ]
+            }
+        )
+
+
+class AutocompleteView(APIView):
+    """
+    Подсказки по началу названий произведений, жанров и категорий.
+
+    Отвечает из префиксного индекса в памяти процесса, без запросов к
+    базе.
+    """
+
+    def get(self, request):
+        limit = get_limit(
+            request,
+            settings.AUTOCOMPLETE_LIMIT,
+            settings.AUTOCOMPLETE_MAX_LIMIT,
+        )
+        return Response(
+            autocomplete_index.search(request.query_params.get("q", ""),
+                                      limit)
+        )
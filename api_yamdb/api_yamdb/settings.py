@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -85,6 +85,74 @@ DATABASES = {
     }
 }
 
+# Локальный кэш процесса; для нескольких процессов укажите общий бэкенд
+# (Redis, Memcached), иначе сброс записей виден только в своём процессе.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api_yamdb",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+CATALOGUE_CACHE_TIMEOUT = 60 * 60
+
+TITLE_CACHE_TIMEOUT = 60 * 60
+
+SLUG_CACHE_TIMEOUT = 5 * 60
+
+# Массовая загрузка произведений: записей в одной транзакции и в запросе.
+BULK_TITLES_CHUNK_SIZE = 500
+
+BULK_TITLES_MAX_ITEMS = 50000
+
+# Взвешенный рейтинг: (сумма оценок + m * C) / (число оценок + m),
+# где C - априорная средняя оценка, m - число "виртуальных" голосов.
+RATING_PRIOR_MEAN = 6.0
+
+RATING_MIN_VOTES = 10
+
+AUTOCOMPLETE_LIMIT = 10
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Префиксы с большим числом ключей отвечают из списков первых мест;
+# списки для префиксов до AUTOCOMPLETE_WARM_PREFIX_LENGTH символов
+# строятся вместе с индексом.
+AUTOCOMPLETE_SCAN_LIMIT = 256
+
+AUTOCOMPLETE_WARM_PREFIX_LENGTH = 2
+
+AUTOCOMPLETE_REFRESH_INTERVAL = 5 * 60
+
+LEADERBOARD_LIMIT = 10
+
+LEADERBOARD_MAX_LIMIT = 100
+
+# Счётчик популярности хранит log2 суммы весов 2 ** (возраст эпохи /
+# период полураспада), поэтому эпоху не нужно сдвигать.
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+TRENDING_HALF_LIFE = timedelta(days=3)
+
+TRENDING_REVIEW_WEIGHT = 1.0
+
+TRENDING_COMMENT_WEIGHT = 0.5
+
+SIMILAR_TITLES_LIMIT = 20
+
+SIMILAR_REVIEW_WEIGHT = 1.0
+
+SIMILAR_GENRE_WEIGHT = 0.5
+
+# Близость по жанрам считается только с этим числом произведений жанра
+# с наибольшим числом отзывов (и с произведениями с общими авторами).
+SIMILAR_GENRE_CANDIDATES = 50
+
+# Если очередь затрагивает большую долю произведений, refresh_similar_titles
+# пересчитывает индекс целиком.
+SIMILAR_TITLES_REBUILD_SHARE = 0.2
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -126,6 +194,8 @@ ROLE_MAX_LENGTH = 255
 
 OBJECT_MAX_LENGTH = 25
 
+LEADERBOARD_MAX_LENGTH = 16
+
 USER_ROLE = "user"
 
 MODERATOR_ROLE = "moderator"
@@ -45,7 +45,7 @@ class CommonDataAbstractModelTwo(models.Model):
         User,
         on_delete=models.CASCADE,
         verbose_name="review_author",
-        related_name="reviews",
+        related_name="%(class)ss",
     )
 
     class Meta:
@@ -54,3 +54,57 @@ class CommonDataAbstractModelTwo(models.Model):
 
     def __str__(self):
         return self.text[:s.NAME_OBJECT_MAX_LENGTH]
+
+
+SCORES = range(1, 11)
+
+
+class ScoreHistogramAbstractModel(models.Model):
+    """
+    Абстрактная модель для хранения числа оценок 1-10 произведения.
+    """
+
+    score_1_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_1_count"
+    )
+    score_2_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_2_count"
+    )
+    score_3_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_3_count"
+    )
+    score_4_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_4_count"
+    )
+    score_5_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_5_count"
+    )
+    score_6_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_6_count"
+    )
+    score_7_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_7_count"
+    )
+    score_8_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_8_count"
+    )
+    score_9_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_9_count"
+    )
+    score_10_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="title_score_10_count"
+    )
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def histogram_field(score):
+        return f"score_{score}_count"
+
+    @property
+    def score_histogram(self):
+        return {
+            score: getattr(self, self.histogram_field(score))
+            for score in SCORES
+        }
@@ -5,7 +5,9 @@ from django.db.models.query import QuerySet
 from django.http.request import HttpRequest
 from django.template.defaultfilters import truncatewords
 
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.models import (Category, Comment, Genre, ImportCheckpoint, Review,
+                            Title, TitleGenre)
+from reviews.search import search_titles
 
 
 class TitleGenreInline(admin.TabularInline):
@@ -49,6 +51,11 @@ class TitleAdmin(admin.ModelAdmin):
         current_qs = super().get_queryset(request)
         return current_qs.prefetch_related("genre")
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_titles(queryset, search_term), False
+
     @admin.display(description="genre")
     def get_genre(self, obj):
         return "\n".join([genre.name for genre in obj.genre.all()])
@@ -88,3 +95,8 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ("review__text", "author__username", "text")
     list_display_links = ("review",)
     list_filter = ("review__title",)
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("filename", "rows", "updated_at")
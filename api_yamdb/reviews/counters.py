@@ -0,0 +1,67 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from reviews.models import Comment, Review, Title
+
+
+def update_comments_count(review_id, delta):
+    """
+    Изменяет счётчик комментариев отзыва одним UPDATE-запросом.
+    """
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F("comments_count") + delta
+    )
+
+
+def actual_comments_count():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(review=OuterRef("pk"))
+            .order_by()
+            .values("review")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def actual_reviews_count():
+    return Coalesce(
+        Subquery(
+            Review.objects.filter(title=OuterRef("pk"))
+            .order_by()
+            .values("title")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def counter_mismatches():
+    """
+    Находит записи, у которых сохранённый счётчик расходится с данными.
+
+    Returns:
+    - dict: Для Review и Title - QuerySet расходящихся записей с
+    аннотацией actual.
+    """
+    return {
+        Review: Review.objects.annotate(actual=actual_comments_count())
+        .filter(~Q(comments_count=F("actual")))
+        .order_by("pk"),
+        Title: Title.objects.annotate(actual=actual_reviews_count())
+        .filter(~Q(rating_count=F("actual")))
+        .order_by("pk"),
+    }
+
+
+def repair_comments_counts():
+    """
+    Пересчитывает счётчики комментариев всех отзывов.
+
+    Returns:
+    - int: Количество обновлённых отзывов.
+    """
+    return Review.objects.update(comments_count=actual_comments_count())
@@ -0,0 +1,130 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment, Review, Title, TitleGenre
+
+CHUNK_SIZE = 2000
+FORMATS = ("ndjson", "csv")
+
+
+def iter_titles(chunk_size=CHUNK_SIZE):
+    """
+    Выгружает произведения с жанрами, категорией и рейтингом.
+
+    Произведения и связи с жанрами читаются двумя серверными курсорами,
+    упорядоченными по id произведения, и сливаются на лету, поэтому в
+    памяти находится только текущее произведение.
+    """
+    titles = (
+        Title.objects.order_by("pk")
+        .values_list(
+            "id", "name", "year", "description", "category__slug", "rating"
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    genres = (
+        TitleGenre.objects.order_by("title_id_id", "genre_id__slug")
+        .values_list("title_id_id", "genre_id__slug")
+        .iterator(chunk_size=chunk_size)
+    )
+    genre_row = next(genres, None)
+    for title_id, name, year, description, category, rating in titles:
+        while genre_row is not None and genre_row[0] < title_id:
+            genre_row = next(genres, None)
+        title_genres = []
+        while genre_row is not None and genre_row[0] == title_id:
+            title_genres.append(genre_row[1])
+            genre_row = next(genres, None)
+        yield {
+            "id": title_id,
+            "name": name,
+            "year": year,
+            "description": description,
+            "category": category,
+            "genre": title_genres,
+            "rating": rating,
+        }
+
+
+def iter_reviews(chunk_size=CHUNK_SIZE):
+    """
+    Выгружает отзывы с именами авторов.
+    """
+    yield from (
+        Review.objects.order_by("pk")
+        .values("id", "title_id", "author__username", "text", "score",
+                "pub_date")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_comments(chunk_size=CHUNK_SIZE):
+    """
+    Выгружает комментарии с именами авторов.
+    """
+    yield from (
+        Comment.objects.order_by("pk")
+        .values("id", "review_id", "author__username", "text", "pub_date")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+EXPORTS = {
+    "titles": (
+        iter_titles,
+        ("id", "name", "year", "description", "category", "genre", "rating"),
+    ),
+    "reviews": (
+        iter_reviews,
+        ("id", "title_id", "author__username", "text", "score", "pub_date"),
+    ),
+    "comments": (
+        iter_comments,
+        ("id", "review_id", "author__username", "text", "pub_date"),
+    ),
+}
+
+
+class Echo:
+    """
+    Буфер для csv.writer, возвращающий записанную строку.
+    """
+
+    def write(self, value):
+        return value
+
+
+def render_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield "\n"
+
+
+def render_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            ",".join(row[field]) if isinstance(row[field], list)
+            else row[field]
+            for field in fields
+        )
+
+
+def export_lines(resource, export_format="ndjson", chunk_size=CHUNK_SIZE):
+    """
+    Возвращает генератор строк выгрузки ресурса в заданном формате.
+
+    Raises:
+    - KeyError: Если ресурс неизвестен.
+    - ValueError: Если формат не поддерживается.
+    """
+    iterator, fields = EXPORTS[resource]
+    rows = iterator(chunk_size)
+    if export_format == "ndjson":
+        return render_ndjson(rows)
+    if export_format == "csv":
+        return render_csv(rows, fields)
+    raise ValueError(f"Unsupported export format: {export_format}")
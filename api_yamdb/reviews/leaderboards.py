@@ -0,0 +1,99 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from reviews.models import LeaderboardEntry, Title, TitleGenre
+
+BATCH_SIZE = 1000
+
+
+def leaderboard_rows(titles, title_genres):
+    """
+    Строит позиции рейтингов по данным произведений.
+
+    Parameters:
+    - titles: Кортежи (id, год, id категории, рейтинг, число отзывов)
+    произведений с оценками.
+    - title_genres: Пары (id произведения, id жанра).
+
+    Returns:
+    - generator: Словари полей LeaderboardEntry.
+    """
+    genres = defaultdict(list)
+    for title_id, genre_id in title_genres:
+        genres[title_id].append(genre_id)
+    for pk, year, category_id, rating, rating_count in titles:
+        scopes = [
+            (LeaderboardEntry.ALL, 0),
+            (LeaderboardEntry.CATEGORY, category_id),
+            (LeaderboardEntry.YEAR, year),
+        ] + [(LeaderboardEntry.GENRE, genre_id) for genre_id in genres[pk]]
+        for board, value in (
+            (LeaderboardEntry.RATING, rating),
+            (LeaderboardEntry.REVIEWS, rating_count),
+        ):
+            for scope, scope_id in scopes:
+                yield dict(
+                    board=board,
+                    scope=scope,
+                    scope_id=scope_id,
+                    title_id=pk,
+                    value=value,
+                )
+
+
+def title_entries(titles):
+    """
+    Строит позиции рейтингов для произведений с оценками.
+
+    Parameters:
+    - titles: QuerySet произведений.
+
+    Returns:
+    - generator: Несохранённые объекты LeaderboardEntry.
+    """
+    titles = titles.filter(rating_count__gt=0).order_by()
+    rows = leaderboard_rows(
+        titles.values_list(
+            "pk", "year", "category_id", "rating", "rating_count"
+        ).iterator(),
+        TitleGenre.objects.filter(
+            title_id__in=titles.values("pk")
+        ).values_list("title_id_id", "genre_id_id"),
+    )
+    return (LeaderboardEntry(**row) for row in rows)
+
+
+def refresh_title_leaderboards(title_ids):
+    """
+    Пересобирает позиции рейтингов для нескольких произведений.
+
+    Старые записи произведений удаляются и создаются заново из
+    сохранённых в Title рейтинга и числа отзывов, без агрегации отзывов.
+    """
+    title_ids = set(title_ids)
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(title_id__in=title_ids).delete()
+        LeaderboardEntry.objects.bulk_create(
+            title_entries(Title.objects.filter(pk__in=title_ids))
+        )
+
+
+def rebuild_leaderboards(batch_size=BATCH_SIZE):
+    """
+    Пересобирает все рейтинги по сохранённым рейтингам произведений.
+
+    Returns:
+    - int: Количество созданных записей.
+    """
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        entries = title_entries(Title.objects.all())
+        created = 0
+        while True:
+            batch = list(islice(entries, batch_size))
+            if not batch:
+                return created
+            LeaderboardEntry.objects.bulk_create(batch)
+            created += len(batch)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.counters import counter_mismatches, repair_comments_counts
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Review, Title
+from reviews.ratings import rebuild_title_ratings
+from reviews.signals import data_rebuilt
+
+COUNTERS = {
+    Review: "comments_count",
+    Title: "rating_count",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares stored review and comment counters with the data and "
+        "optionally repairs them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Recalculate counters that do not match the data",
+        )
+
+    def handle(self, *args, **options):
+        found = 0
+        for model, queryset in counter_mismatches().items():
+            field = COUNTERS[model]
+            for obj in queryset:
+                found += 1
+                self.stdout.write(
+                    f"{model.__name__} {obj.pk}: {field}="
+                    f"{getattr(obj, field)}, actual={obj.actual}"
+                )
+        if not found:
+            self.stdout.write(self.style.SUCCESS("All counters match"))
+            return
+        if not options["repair"]:
+            raise CommandError(
+                f"Found {found} inconsistent counters, run with --repair"
+            )
+        repair_comments_counts()
+        rebuild_title_ratings()
+        rebuild_leaderboards()
+        data_rebuilt.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(f"Repaired {found} counters"))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.exporters import CHUNK_SIZE, EXPORTS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = "Streams titles, reviews or comments as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=sorted(EXPORTS))
+        parser.add_argument(
+            "--format", dest="export_format", choices=FORMATS,
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to (stdout by default)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows fetched from the database cursor at a time",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be a positive number")
+        lines = export_lines(
+            options["resource"],
+            options["export_format"],
+            options["chunk_size"],
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", encoding="utf8",
+                  newline="") as file:
+            file.writelines(lines)
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {options['resource']} to "
+                               f"{options['output']}"),
+        )
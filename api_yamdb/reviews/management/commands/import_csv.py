@@ -1,91 +1,357 @@
 import csv
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
 
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.counters import repair_comments_counts
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import (Category, Comment, Genre, ImportCheckpoint, Review,
+                            Title, TitleGenre)
+from reviews.ratings import rebuild_title_ratings
+from reviews.signals import data_rebuilt
+from reviews.similarity import rebuild_similar_titles
+from reviews.trending import rebuild_trending
 
 User = get_user_model()
 
-dictionary = {
-    "static/data/users.csv": User,
-    "static/data/category.csv": Category,
-    "static/data/genre.csv": Genre,
-}
-
-
-def cut_list_line(csvfile):
-    reader = csv.reader(csvfile)
-    reader = list(reader)
-    reader.pop(0)
-    return reader
-
-
-def import_data():
-    for key, value in dictionary.items():
-        with open(key, encoding="utf8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            objs = [value(**row) for row in reader]
-            value.objects.bulk_create(objs)
-
-    with open("static/data/titles.csv", encoding="utf8") as csvfile:
-        reader = cut_list_line(csvfile)
-        objs = [
-            Title(
-                id=row[0],
-                name=row[1],
-                year=row[2],
-                category=Category.objects.get(id=row[3]),
-            )
-            for row in reader
-        ]
-        Title.objects.bulk_create(objs)
-
-    with open("static/data/review.csv", encoding="utf8") as csvfile:
-        reader = cut_list_line(csvfile)
-        objs = [
-            Review(
-                id=row[0],
-                title_id=row[1],
-                text=row[2],
-                author=User.objects.get(id=row[3]),
-                score=row[4],
-                pub_date=row[5],
+DATA_DIR = settings.BASE_DIR / "static/data"
+BATCH_SIZE = 1000
+WORKERS = 4
+
+
+class CsvImport:
+    """
+    Описание импорта одного CSV-файла.
+
+    Attributes:
+    - filename: Имя файла в каталоге DATA_DIR.
+    - model: Модель, в которую загружаются строки.
+    - columns: Соответствие полей модели колонкам файла.
+    - references: Модели, на которые ссылаются поля *_id.
+    """
+
+    def __init__(self, filename, model, columns, references=None):
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+        self.references = references or {}
+
+    @property
+    def name(self):
+        return self.filename.rsplit(".", 1)[0]
+
+    def build(self, row):
+        return self.model(
+            **{field: row[column] for field, column in self.columns.items()}
+        )
+
+
+IMPORTS = (
+    CsvImport(
+        "users.csv",
+        User,
+        {
+            "id": "id",
+            "username": "username",
+            "email": "email",
+            "role": "role",
+            "bio": "bio",
+            "first_name": "first_name",
+            "last_name": "last_name",
+        },
+    ),
+    CsvImport("category.csv", Category, {"id": "id", "name": "name",
+                                         "slug": "slug"}),
+    CsvImport("genre.csv", Genre, {"id": "id", "name": "name",
+                                   "slug": "slug"}),
+    CsvImport(
+        "titles.csv",
+        Title,
+        {"id": "id", "name": "name", "year": "year",
+         "category_id": "category"},
+        {"category_id": Category},
+    ),
+    CsvImport(
+        "review.csv",
+        Review,
+        {"id": "id", "title_id": "title_id", "text": "text",
+         "author_id": "author", "score": "score", "pub_date": "pub_date"},
+        {"title_id": Title, "author_id": User},
+    ),
+    CsvImport(
+        "genre_title.csv",
+        TitleGenre,
+        {"id": "id", "title_id_id": "title_id", "genre_id_id": "genre_id"},
+        {"title_id_id": Title, "genre_id_id": Genre},
+    ),
+    CsvImport(
+        "comments.csv",
+        Comment,
+        {"id": "id", "review_id": "review_id", "text": "text",
+         "author_id": "author", "pub_date": "pub_date"},
+        {"review_id": Review, "author_id": User},
+    ),
+)
+
+
+def read_rows(path):
+    """
+    Построчно читает CSV-файл, не загружая его в память целиком.
+    """
+    with open(path, encoding="utf8", newline="") as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def batched(rows, size):
+    """
+    Разбивает поток строк на списки не длиннее size.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def dangling_references(objs, references):
+    """
+    Находит объекты со ссылками на несуществующие записи.
+
+    Для каждого внешнего ключа выполняется один запрос на всю пачку.
+
+    Returns:
+    - list: Тройки (номер объекта в пачке, поле, значение).
+    """
+    dangling = []
+    for field, model in references.items():
+        ids = {str(getattr(obj, field)) for obj in objs}
+        existing = {
+            str(pk)
+            for pk in model.objects.filter(pk__in=ids).values_list(
+                "pk", flat=True
             )
-            for row in reader
-        ]
-        Review.objects.bulk_create(objs)
-
-    with open("static/data/genre_title.csv", encoding="utf8") as csvfile:
-        reader = cut_list_line(csvfile)
-        objs = [
-            TitleGenre(
-                id=row[0],
-                title_id=Title.objects.get(id=row[1]),
-                genre_id=Genre.objects.get(id=row[2]),
+        }
+        dangling.extend(
+            (position, field, getattr(obj, field))
+            for position, obj in enumerate(objs)
+            if str(getattr(obj, field)) not in existing
+        )
+    return sorted(dangling)
+
+
+def import_file(spec, batch_size=BATCH_SIZE, stdout=None, db_lock=None):
+    """
+    Загружает файл пачками фиксированного размера, начиная с контрольной
+    точки.
+
+    Каждая пачка записывается одним bulk_create в отдельной транзакции
+    вместе с продвижением контрольной точки, поэтому после сбоя повторный
+    запуск продолжает загрузку с первой незафиксированной строки.
+    Работа с базой выполняется под db_lock, если он передан.
+
+    Строки со ссылками на несуществующие записи не пропускаются: пачка
+    откатывается с CommandError, и контрольная точка остаётся перед ней,
+    чтобы после загрузки недостающих файлов повторный запуск загрузил
+    эти строки.
+
+    Returns:
+    - int: Количество загруженных строк.
+    """
+    db_lock = db_lock or nullcontext()
+    with db_lock:
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            filename=spec.filename
+        )
+    imported = 0
+    started = time.monotonic()
+    rows = islice(
+        read_rows(DATA_DIR / spec.filename), checkpoint.rows, None
+    )
+    for batch in batched(rows, batch_size):
+        objs = [spec.build(row) for row in batch]
+        with db_lock, transaction.atomic():
+            dangling = dangling_references(objs, spec.references)
+            if dangling:
+                raise CommandError(
+                    f"{spec.filename}: rows reference missing records: "
+                    + ", ".join(
+                        f"row {checkpoint.rows + imported + position + 1} "
+                        f"{field}={value}"
+                        for position, field, value in dangling[:10]
+                    )
+                    + ". Import the referenced files first."
+                )
+            spec.model.objects.bulk_create(objs, batch_size=batch_size)
+            ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                rows=F("rows") + len(batch)
             )
-            for row in reader
-        ]
-        TitleGenre.objects.bulk_create(objs)
-
-    with open("static/data/comments.csv", encoding="utf8") as csvfile:
-        reader = cut_list_line(csvfile)
-        objs = [
-            Comment(
-                id=row[0],
-                review_id=row[1],
-                text=row[2],
-                author=User.objects.get(id=row[3]),
-                pub_date=row[4],
+        imported += len(objs)
+        if stdout is not None:
+            rate = imported / max(time.monotonic() - started, 1e-6)
+            stdout.write(
+                f"{spec.filename}: {checkpoint.rows + imported} rows "
+                f"({rate:.0f} rows/s)"
             )
-            for row in reader
-        ]
-        Comment.objects.bulk_create(objs)
+    return imported
+
+
+def select_imports(only=None, skip=None):
+    """
+    Возвращает описания файлов с учётом фильтров --only и --skip.
+
+    Файлы можно указывать с расширением или без него.
+    """
+    names = {spec.name for spec in IMPORTS}
+    only = {name.rsplit(".", 1)[0] for name in only or []}
+    skip = {name.rsplit(".", 1)[0] for name in skip or []}
+    unknown = (only | skip) - names
+    if unknown:
+        raise CommandError(
+            f"Unknown files: {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(sorted(names))}"
+        )
+    return [
+        spec
+        for spec in IMPORTS
+        if spec.name in (only or names) and spec.name not in skip
+    ]
+
+
+def dependency_graph(specs):
+    """
+    Строит граф зависимостей файлов по внешним ключам.
+
+    Returns:
+    - dict: Для имени каждого файла - имена файлов, которые должны быть
+    загружены раньше него. Файлы вне specs считаются уже загруженными.
+    """
+    loaders = {spec.model: spec.name for spec in specs}
+    return {
+        spec.name: {
+            loaders[model]
+            for model in spec.references.values()
+            if model in loaders and loaders[model] != spec.name
+        }
+        for spec in specs
+    }
+
+
+def import_file_in_thread(spec, batch_size, stdout, db_lock):
+    try:
+        return import_file(spec, batch_size, stdout, db_lock)
+    finally:
+        connection.close()
+
+
+def import_data(batch_size=BATCH_SIZE, stdout=None, only=None, skip=None,
+                workers=WORKERS):
+    """
+    Загружает файлы в пуле потоков в порядке зависимостей.
+
+    Файл ставится в очередь, как только загружены все файлы, на которые
+    ссылаются его внешние ключи, поэтому независимые файлы (users,
+    category, genre) загружаются одновременно, а итоговое состояние базы
+    совпадает с последовательной загрузкой. SQLite допускает только
+    одного писателя, поэтому для него запросы потоков сериализуются, а
+    параллельно идут чтение и разбор файлов.
+    """
+    specs = {spec.name: spec for spec in select_imports(only, skip)}
+    pending = dependency_graph(specs.values())
+    done = set()
+    running = {}
+    db_lock = threading.Lock() if connection.vendor == "sqlite" else None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            for name, dependencies in list(pending.items()):
+                if dependencies <= done:
+                    del pending[name]
+                    future = executor.submit(
+                        import_file_in_thread,
+                        specs[name],
+                        batch_size,
+                        stdout,
+                        db_lock,
+                    )
+                    running[future] = name
+            if not running:
+                raise CommandError(
+                    f"Circular dependencies: {', '.join(sorted(pending))}"
+                )
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                imported = future.result()
+                done.add(name)
+                if stdout is not None:
+                    stdout.write(
+                        f"{specs[name].filename}: {imported} rows imported"
+                    )
+    rebuild_title_ratings()
+    repair_comments_counts()
+    rebuild_leaderboards()
+    rebuild_trending()
+    rebuild_similar_titles()
+    data_rebuilt.send(sender=CsvImport)
 
 
 class Command(BaseCommand):
-    help = "Imports data from a CSV file into the YourModel model"
+    help = "Imports data from the CSV files in static/data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows per bulk_create batch and transaction",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            default=[],
+            help="Import only these files (e.g. users genre.csv)",
+        )
+        parser.add_argument(
+            "--skip",
+            nargs="+",
+            default=[],
+            help="Do not import these files",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Files imported concurrently",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Forget saved checkpoints and read the files from the start",
+        )
 
     def handle(self, *args, **options):
-        import_data()
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError(
+                "--batch-size and --workers must be positive numbers"
+            )
+        specs = select_imports(options["only"], options["skip"])
+        if options["reset"]:
+            ImportCheckpoint.objects.filter(
+                filename__in=[spec.filename for spec in specs]
+            ).delete()
+        import_data(
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+            only=options["only"],
+            skip=options["skip"],
+            workers=options["workers"],
+        )
         self.stdout.write(self.style.SUCCESS("Data imported successfully"))
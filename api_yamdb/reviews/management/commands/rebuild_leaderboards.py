@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recalculates leaderboard tables from the stored title ratings"
+
+    def handle(self, *args, **options):
+        count = rebuild_leaderboards()
+        self.stdout.write(
+            self.style.SUCCESS(f"Leaderboards rebuilt: {count} entries")
+        )
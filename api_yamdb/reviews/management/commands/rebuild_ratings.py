@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import rebuild_title_ratings
+from reviews.signals import data_rebuilt
+
+
+class Command(BaseCommand):
+    help = "Recalculates stored title ratings from the reviews table"
+
+    def handle(self, *args, **options):
+        count = rebuild_title_ratings()
+        data_rebuilt.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f"Ratings rebuilt for {count} titles")
+        )
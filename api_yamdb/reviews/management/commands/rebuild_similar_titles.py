@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.similarity import rebuild_similar_titles
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the similar titles index from reviews and genres"
+
+    def handle(self, *args, **options):
+        count = rebuild_similar_titles()
+        self.stdout.write(
+            self.style.SUCCESS(f"Similar titles rebuilt: {count} pairs")
+        )
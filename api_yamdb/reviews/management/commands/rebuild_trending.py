@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.signals import data_rebuilt
+from reviews.trending import rebuild_trending
+
+
+class Command(BaseCommand):
+    help = "Recalculates title trending scores from review and comment history"
+
+    def handle(self, *args, **options):
+        count = rebuild_trending()
+        data_rebuilt.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f"Trending scores rebuilt for {count} titles")
+        )
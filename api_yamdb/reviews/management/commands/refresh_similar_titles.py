@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.similarity import refresh_queued_similar_titles
+
+
+class Command(BaseCommand):
+    help = "Refreshes similar titles for titles queued by review changes"
+
+    def handle(self, *args, **options):
+        count = refresh_queued_similar_titles()
+        self.stdout.write(
+            self.style.SUCCESS(f"Similar titles refreshed: {count} titles")
+        )
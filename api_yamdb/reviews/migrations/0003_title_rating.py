@@ -0,0 +1,67 @@
+# Generated by Django 3.2 on 2026-10-18 19:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.functions
+import django.db.models.deletion
+
+
+def fill_title_ratings(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = Review.objects.filter(title=models.OuterRef('pk')).order_by()
+    Title.objects.update(
+        rating_sum=models.functions.Coalesce(
+            models.Subquery(
+                reviews.values('title')
+                .annotate(total=models.Sum('score'))
+                .values('total')
+            ),
+            0,
+        ),
+        rating_count=models.functions.Coalesce(
+            models.Subquery(
+                reviews.values('title')
+                .annotate(total=models.Count('pk'))
+                .values('total')
+            ),
+            0,
+        ),
+        rating=models.Subquery(
+            reviews.values('title')
+            .annotate(average=models.Avg('score'))
+            .values('average')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='title_rating'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='title_rating_count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='title_rating_sum'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to=settings.AUTH_USER_MODEL, verbose_name='review_author'),
+        ),
+        migrations.RunPython(fill_title_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from reviews.search import FTS_TABLE, FTS_TRIGGERS, install_title_search
+
+
+def create_title_search(apps, schema_editor):
+    install_title_search(schema_editor.connection)
+
+
+def drop_title_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in FTS_TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_title_search, drop_title_search),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 3.2 on 2026-10-18 20:02
+
+from collections import defaultdict
+from itertools import islice
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def leaderboard_entries(Title, TitleGenre, LeaderboardEntry):
+    titles = Title.objects.filter(rating_count__gt=0).order_by()
+    genres = defaultdict(list)
+    for title_id, genre_id in TitleGenre.objects.filter(
+        title_id__in=titles.values('pk')
+    ).values_list('title_id_id', 'genre_id_id'):
+        genres[title_id].append(genre_id)
+    for pk, year, category_id, rating, rating_count in titles.values_list(
+        'pk', 'year', 'category_id', 'rating', 'rating_count'
+    ).iterator():
+        scopes = [('all', 0), ('category', category_id), ('year', year)]
+        scopes += [('genre', genre_id) for genre_id in genres[pk]]
+        for board, value in (('rating', rating), ('reviews', rating_count)):
+            for scope, scope_id in scopes:
+                yield LeaderboardEntry(
+                    board=board,
+                    scope=scope,
+                    scope_id=scope_id,
+                    title_id=pk,
+                    value=value,
+                )
+
+
+def fill_leaderboards(apps, schema_editor):
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    entries = leaderboard_entries(Title, TitleGenre, LeaderboardEntry)
+    while True:
+        batch = list(islice(entries, 1000))
+        if not batch:
+            return
+        LeaderboardEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('rating', 'rating'), ('reviews', 'reviews')], max_length=16, verbose_name='leaderboard_board')),
+                ('scope', models.CharField(choices=[('all', 'all'), ('genre', 'genre'), ('category', 'category'), ('year', 'year')], max_length=16, verbose_name='leaderboard_scope')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='leaderboard_scope_id')),
+                ('value', models.FloatField(verbose_name='leaderboard_value')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='leaderboard_title')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Позиции в рейтингах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', 'scope', 'scope_id', '-value', 'title'], name='leaderboard_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'scope', 'scope_id', 'title'), name='unique_leaderboard_title'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
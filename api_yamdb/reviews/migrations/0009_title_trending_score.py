@@ -0,0 +1,58 @@
+# Generated by Django 3.2 on 2026-10-18 20:04
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def activity_weight(moment, weight):
+    age = (moment - settings.TRENDING_EPOCH) / settings.TRENDING_HALF_LIFE
+    return weight * 2 ** age
+
+
+def fill_trending_scores(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    scores = defaultdict(float)
+    for events, weight in (
+        (
+            Review.objects.values_list('title_id', 'pub_date'),
+            settings.TRENDING_REVIEW_WEIGHT,
+        ),
+        (
+            Comment.objects.values_list('review__title_id', 'pub_date'),
+            settings.TRENDING_COMMENT_WEIGHT,
+        ),
+    ):
+        for title_id, pub_date in events.iterator():
+            scores[title_id] += activity_weight(pub_date, weight)
+    Title.objects.bulk_update(
+        [
+            Title(pk=title_id, trending_score=score)
+            for title_id, score in scores.items()
+        ],
+        ['trending_score'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='title_trending_score'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-trending_score', 'id'], name='title_trending_idx'),
+        ),
+        migrations.RunPython(fill_trending_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 3.2 on 2026-10-18 20:07
+
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations, islice
+from math import sqrt
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SIMILAR_TITLES_LIMIT = 20
+SIMILAR_REVIEW_WEIGHT = 1.0
+SIMILAR_GENRE_WEIGHT = 0.5
+SIMILAR_GENRE_CANDIDATES = 50
+
+
+def similar_title_entries(reviews, title_genres, review_counts, SimilarTitle):
+    reviewed = defaultdict(list)
+    for title_id, author_id in reviews:
+        reviewed[author_id].append(title_id)
+    co_reviews = defaultdict(Counter)
+    for title_ids in reviewed.values():
+        for first, second in combinations(sorted(set(title_ids)), 2):
+            co_reviews[first][second] += 1
+            co_reviews[second][first] += 1
+    genres = defaultdict(set)
+    genre_titles = defaultdict(set)
+    for title_id, genre_id in title_genres:
+        genres[title_id].add(genre_id)
+        genre_titles[genre_id].add(title_id)
+    top_titles = {
+        genre_id: heapq.nsmallest(
+            SIMILAR_GENRE_CANDIDATES,
+            title_ids,
+            key=lambda title_id: (-review_counts.get(title_id, 0), title_id),
+        )
+        for genre_id, title_ids in genre_titles.items()
+    }
+    for title_id in review_counts:
+        candidates = set(co_reviews[title_id])
+        for genre_id in genres[title_id]:
+            candidates.update(top_titles[genre_id])
+        candidates.discard(title_id)
+        scores = []
+        for other in candidates:
+            score = 0.0
+            shared = co_reviews[title_id][other]
+            if shared:
+                score += SIMILAR_REVIEW_WEIGHT * shared / sqrt(
+                    review_counts[title_id] * review_counts[other]
+                )
+            shared = len(genres[title_id] & genres[other])
+            if shared:
+                score += SIMILAR_GENRE_WEIGHT * shared / (
+                    len(genres[title_id]) + len(genres[other]) - shared
+                )
+            if score:
+                scores.append((score, other))
+        for score, other in heapq.nlargest(
+            SIMILAR_TITLES_LIMIT, scores, key=lambda item: (item[0], -item[1])
+        ):
+            yield SimilarTitle(title_id=title_id, similar_id=other, score=score)
+
+
+def fill_similar_titles(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    SimilarTitle = apps.get_model('reviews', 'SimilarTitle')
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    entries = similar_title_entries(
+        Review.objects.values_list('title_id', 'author_id').iterator(),
+        TitleGenre.objects.values_list(
+            'title_id_id', 'genre_id_id'
+        ).iterator(),
+        dict(Title.objects.values_list('pk', 'rating_count')),
+        SimilarTitle,
+    )
+    while True:
+        batch = list(islice(entries, 1000))
+        if not batch:
+            return
+        SimilarTitle.objects.bulk_create(batch)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarTitle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='similar_score')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='similar_similar')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_titles', to='reviews.title', verbose_name='similar_title')),
+            ],
+            options={
+                'verbose_name': 'Похожее произведение',
+                'verbose_name_plural': 'Похожие произведения',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='similartitle',
+            index=models.Index(fields=['title', '-score', 'similar'], name='similar_title_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='similartitle',
+            constraint=models.UniqueConstraint(fields=('title', 'similar'), name='unique_similar_title'),
+        ),
+        migrations.RunPython(fill_similar_titles, migrations.RunPython.noop),
+    ]
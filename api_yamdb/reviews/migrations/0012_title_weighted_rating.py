@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-18 20:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.functions
+import reviews.models
+
+
+def fill_weighted_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    prior_votes = settings.RATING_MIN_VOTES
+    Title.objects.update(
+        weighted_rating=models.ExpressionWrapper(
+            (
+                models.functions.Cast('rating_sum', models.FloatField())
+                + prior_votes * settings.RATING_PRIOR_MEAN
+            )
+            / (
+                models.functions.Cast('rating_count', models.FloatField())
+                + prior_votes
+            ),
+            output_field=models.FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(default=reviews.models.default_weighted_rating, editable=False, verbose_name='title_weighted_rating'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['weighted_rating'], name='title_weighted_rating_idx'),
+        ),
+        migrations.RunPython(fill_weighted_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 20:12
+
+from django.db import migrations, models
+import django.db.models.functions
+
+
+def fill_comments_counts(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    Review.objects.update(
+        comments_count=django.db.models.functions.Coalesce(
+            models.Subquery(
+                Comment.objects.filter(review=models.OuterRef('pk'))
+                .order_by()
+                .values('review')
+                .annotate(total=models.Count('pk'))
+                .values('total')
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_weighted_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='review_comments_count'),
+        ),
+        migrations.RunPython(fill_comments_counts, migrations.RunPython.noop),
+    ]
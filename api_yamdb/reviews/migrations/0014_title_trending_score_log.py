@@ -0,0 +1,64 @@
+# Generated by Django 3.2 on 2026-10-18 20:46
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def activity_weight(moment, weight):
+    age = (moment - settings.TRENDING_EPOCH) / settings.TRENDING_HALF_LIFE
+    return math.log2(weight) + age
+
+
+def log_add(first, second):
+    if first is None:
+        return second
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def fill_trending_scores(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    scores = {}
+    for events, weight in (
+        (
+            Review.objects.values_list('title_id', 'pub_date'),
+            settings.TRENDING_REVIEW_WEIGHT,
+        ),
+        (
+            Comment.objects.values_list('review__title_id', 'pub_date'),
+            settings.TRENDING_COMMENT_WEIGHT,
+        ),
+    ):
+        for title_id, pub_date in events.iterator():
+            scores[title_id] = log_add(
+                scores.get(title_id), activity_weight(pub_date, weight)
+            )
+    Title.objects.update(trending_score=None)
+    Title.objects.bulk_update(
+        [
+            Title(pk=title_id, trending_score=score)
+            for title_id, score in scores.items()
+        ],
+        ['trending_score'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(default=None, editable=False, null=True, verbose_name='title_trending_score'),
+        ),
+        migrations.RunPython(fill_trending_scores, migrations.RunPython.noop),
+    ]
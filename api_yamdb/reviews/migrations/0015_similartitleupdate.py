@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_title_trending_score_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarTitleUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title_id', models.PositiveIntegerField(verbose_name='similar_update_title_id')),
+            ],
+            options={
+                'verbose_name': 'Пересчёт похожих произведений',
+                'verbose_name_plural': 'Пересчёты похожих произведений',
+            },
+        ),
+    ]
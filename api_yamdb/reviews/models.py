@@ -3,11 +3,16 @@ from django.db import models
 
 from reviews.abstract_models import (
     CommonDataAbstractModel,
-    CommonDataAbstractModelTwo
+    CommonDataAbstractModelTwo,
+    ScoreHistogramAbstractModel
 )
 from reviews.validators import validate_year
 
 
+def default_weighted_rating():
+    return s.RATING_PRIOR_MEAN
+
+
 class Category(CommonDataAbstractModel):
     """
     Модель для категорий.
@@ -34,7 +39,7 @@ class Genre(CommonDataAbstractModel):
         return self.name[:s.OBJECT_MAX_LENGTH]
 
 
-class Title(models.Model):
+class Title(ScoreHistogramAbstractModel):
     """
     Модель для заголовков.
     """
@@ -65,15 +70,70 @@ class Title(models.Model):
         related_name="titles",
         through="TitleGenre",
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="title_rating_sum"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="title_rating_count"
+    )
+    rating = models.FloatField(
+        null=True,
+        editable=False,
+        verbose_name="title_rating"
+    )
+    weighted_rating = models.FloatField(
+        default=default_weighted_rating,
+        editable=False,
+        verbose_name="title_weighted_rating"
+    )
+    trending_score = models.FloatField(
+        null=True,
+        default=None,
+        editable=False,
+        verbose_name="title_trending_score"
+    )
 
     class Meta:
         ordering = ["-name"]
+        indexes = [
+            models.Index(fields=["year"], name="title_year_idx"),
+            models.Index(fields=["name"], name="title_name_idx"),
+            models.Index(fields=["rating"], name="title_rating_idx"),
+            models.Index(
+                fields=["weighted_rating"], name="title_weighted_rating_idx"
+            ),
+            models.Index(
+                fields=["-trending_score", "id"], name="title_trending_idx"
+            ),
+        ]
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
 
     def __str__(self):
         return self.name[:s.OBJECT_MAX_LENGTH]
 
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет произведение.
+
+        Счётчики оценок и активности (нередактируемые поля) меняются
+        только атомарными запросами с F-выражениями, поэтому при
+        изменении произведения записываются лишь редактируемые поля:
+        иначе устаревший объект затёр бы счётчики, изменённые после его
+        загрузки.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if field.editable and not field.primary_key
+            ]
+        super().save(*args, **kwargs)
+
 
 class TitleGenre(models.Model):
     """
@@ -93,6 +153,18 @@ class TitleGenre(models.Model):
         related_name="genre_genres",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["genre_id", "title_id"],
+                name="titlegenre_genre_title_idx",
+            ),
+            models.Index(
+                fields=["title_id", "genre_id"],
+                name="titlegenre_title_genre_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title_id} {self.genre_id}"
 
@@ -112,6 +184,11 @@ class Review(CommonDataAbstractModelTwo):
         verbose_name="review_score",
         choices=[(i, i) for i in range(1, 11)]
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="review_comments_count"
+    )
 
     class Meta:
         constraints = [
@@ -120,6 +197,12 @@ class Review(CommonDataAbstractModelTwo):
                 name="unique_author_title"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "pub_date", "id"],
+                name="review_title_pub_date_idx",
+            )
+        ]
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
 
@@ -137,5 +220,189 @@ class Comment(CommonDataAbstractModelTwo):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["review", "pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            )
+        ]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Модель для контрольных точек импорта CSV-файлов.
+
+    Хранит число обработанных строк файла и обновляется в той же
+    транзакции, что и загруженная пачка.
+    """
+
+    filename = models.CharField(
+        max_length=s.COMMON_MAX_LENGTH,
+        unique=True,
+        verbose_name="checkpoint_filename"
+    )
+    rows = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="checkpoint_rows"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="checkpoint_updated_at"
+    )
+
+    class Meta:
+        verbose_name = "Контрольная точка импорта"
+        verbose_name_plural = "Контрольные точки импорта"
+
+    def __str__(self):
+        return f"{self.filename}: {self.rows}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Модель для предрассчитанных позиций произведений в рейтингах.
+
+    Для каждого произведения с оценками хранится значение в общем
+    рейтинге и в рейтингах его жанров, категории и года, поэтому первые
+    N мест читаются по индексу без агрегации отзывов.
+    """
+
+    RATING = "rating"
+    REVIEWS = "reviews"
+    BOARDS = (
+        (RATING, "rating"),
+        (REVIEWS, "reviews"),
+    )
+    ALL = "all"
+    GENRE = "genre"
+    CATEGORY = "category"
+    YEAR = "year"
+    SCOPES = (
+        (ALL, "all"),
+        (GENRE, "genre"),
+        (CATEGORY, "category"),
+        (YEAR, "year"),
+    )
+
+    board = models.CharField(
+        max_length=s.LEADERBOARD_MAX_LENGTH,
+        choices=BOARDS,
+        verbose_name="leaderboard_board"
+    )
+    scope = models.CharField(
+        max_length=s.LEADERBOARD_MAX_LENGTH,
+        choices=SCOPES,
+        verbose_name="leaderboard_scope"
+    )
+    scope_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name="leaderboard_scope_id"
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name="leaderboard_title",
+        related_name="leaderboard_entries",
+    )
+    value = models.FloatField(verbose_name="leaderboard_value")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["board", "scope", "scope_id", "title"],
+                name="unique_leaderboard_title"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["board", "scope", "scope_id", "-value", "title"],
+                name="leaderboard_rank_idx",
+            )
+        ]
+        verbose_name = "Позиция в рейтинге"
+        verbose_name_plural = "Позиции в рейтингах"
+
+
+class SimilarTitle(models.Model):
+    """
+    Модель для соседей произведения в индексе похожих произведений.
+
+    Для каждого произведения хранится не больше SIMILAR_TITLES_LIMIT
+    записей, поэтому список похожих читается одним запросом по индексу.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name="similar_title",
+        related_name="similar_titles",
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name="similar_similar",
+        related_name="+",
+    )
+    score = models.FloatField(verbose_name="similar_score")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title", "similar"],
+                name="unique_similar_title"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["title", "-score", "similar"],
+                name="similar_title_score_idx",
+            )
+        ]
+        verbose_name = "Похожее произведение"
+        verbose_name_plural = "Похожие произведения"
+
+
+class SimilarTitleUpdate(models.Model):
+    """
+    Модель для очереди пересчёта похожих произведений.
+
+    Сигналы отзывов и жанров добавляют сюда id изменённых произведений,
+    а команда refresh_similar_titles пересчитывает их вне запросов.
+    Поле не ссылается на Title, чтобы удаление произведения не удаляло
+    его из очереди.
+    """
+
+    title_id = models.PositiveIntegerField(
+        verbose_name="similar_update_title_id"
+    )
+
+    class Meta:
+        verbose_name = "Пересчёт похожих произведений"
+        verbose_name_plural = "Пересчёты похожих произведений"
+
+
+class ResourceVersion(models.Model):
+    """
+    Модель для версий ресурсов API.
+
+    Версия - время последнего изменения ресурса в микросекундах. Она
+    продвигается в той же транзакции, что и изменение данных, поэтому
+    все процессы видят её вместе с данными; из версий строятся ETag и
+    ключи кэша ответов.
+    """
+
+    name = models.CharField(
+        max_length=255,
+        primary_key=True,
+        verbose_name="resource_version_name"
+    )
+    version = models.BigIntegerField(verbose_name="resource_version")
+
+    class Meta:
+        verbose_name = "Версия ресурса"
+        verbose_name_plural = "Версии ресурсов"
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, OuterRef, Q, Subquery, Sum, Value,
+                              When)
+from django.db.models.functions import Cast, Coalesce
+
+from reviews.abstract_models import SCORES
+from reviews.models import Review, Title
+
+
+def weighted_rating_expression(rating_sum, rating_count):
+    """
+    Возвращает выражение взвешенного (байесовского) рейтинга.
+
+    Среднее сдвигается к RATING_PRIOR_MEAN тем сильнее, чем меньше у
+    произведения оценок по сравнению с RATING_MIN_VOTES.
+    """
+    prior_votes = settings.RATING_MIN_VOTES
+    return ExpressionWrapper(
+        (
+            Cast(rating_sum, FloatField())
+            + prior_votes * settings.RATING_PRIOR_MEAN
+        )
+        / (Cast(rating_count, FloatField()) + prior_votes),
+        output_field=FloatField(),
+    )
+
+
+def rating_expressions(score_delta=0, count_delta=0, histogram=None):
+    """
+    Возвращает выражения для атомарного обновления рейтинга произведения.
+
+    Среднее считается из уже изменённых суммы и количества оценок,
+    для произведения без отзывов рейтинг равен None. histogram задаёт
+    изменение счётчиков гистограммы для каждой оценки.
+    """
+    rating_sum = F("rating_sum") + score_delta
+    rating_count = F("rating_count") + count_delta
+    return {
+        **{
+            Title.histogram_field(score): F(Title.histogram_field(score))
+            + delta
+            for score, delta in (histogram or {}).items()
+            if delta
+        },
+        "rating_sum": rating_sum,
+        "rating_count": rating_count,
+        "rating": Case(
+            When(
+                rating_count__gt=-count_delta,
+                then=ExpressionWrapper(
+                    Cast(rating_sum, FloatField())
+                    / Cast(rating_count, FloatField()),
+                    output_field=FloatField(),
+                ),
+            ),
+            default=Value(None),
+            output_field=FloatField(),
+        ),
+        "weighted_rating": weighted_rating_expression(
+            rating_sum, rating_count
+        ),
+    }
+
+
+def update_title_rating(title_id, score_delta=0, count_delta=0,
+                        histogram=None):
+    """
+    Изменяет сохранённый рейтинг и гистограмму оценок произведения одним
+    UPDATE-запросом.
+    """
+    Title.objects.filter(pk=title_id).update(
+        **rating_expressions(score_delta, count_delta, histogram)
+    )
+
+
+def histogram_median(histogram):
+    """
+    Возвращает медиану оценок по гистограмме или None без оценок.
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+    middle = ((total - 1) // 2, total // 2)
+    values = []
+    seen = 0
+    for score in sorted(histogram):
+        seen += histogram[score]
+        while len(values) < 2 and middle[len(values)] < seen:
+            values.append(score)
+    return sum(values) / 2
+
+
+def score_distribution(title):
+    """
+    Возвращает число оценок, среднее, медиану и гистограмму произведения.
+    """
+    histogram = title.score_histogram
+    return {
+        "count": title.rating_count,
+        "mean": title.rating,
+        "median": histogram_median(histogram),
+        "histogram": histogram,
+    }
+
+
+def rebuild_title_ratings():
+    """
+    Пересчитывает рейтинги всех произведений по таблице отзывов.
+
+    Взвешенный рейтинг считается вторым UPDATE из уже сохранённых сумм,
+    поэтому подхватывает и изменённые настройки априорного среднего.
+
+    Returns:
+    - int: Количество обновлённых произведений.
+    """
+    reviews = Review.objects.filter(title=OuterRef("pk")).order_by()
+    Title.objects.update(
+        **{
+            Title.histogram_field(score): Coalesce(
+                Subquery(
+                    reviews.values("title")
+                    .annotate(total=Count("pk", filter=Q(score=score)))
+                    .values("total")
+                ),
+                0,
+            )
+            for score in SCORES
+        },
+        rating_sum=Coalesce(
+            Subquery(
+                reviews.values("title")
+                .annotate(total=Sum("score"))
+                .values("total")
+            ),
+            0,
+        ),
+        rating_count=Coalesce(
+            Subquery(
+                reviews.values("title")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        ),
+        rating=Subquery(
+            reviews.values("title")
+            .annotate(average=Avg("score"))
+            .values("average")
+        ),
+    )
+    return Title.objects.update(
+        weighted_rating=weighted_rating_expression(
+            F("rating_sum"), F("rating_count")
+        )
+    )
@@ -0,0 +1,109 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "reviews_title_fts"
+FTS_TRIGGERS = {
+    "reviews_title_fts_ai": """
+        CREATE TRIGGER reviews_title_fts_ai AFTER INSERT ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+    "reviews_title_fts_ad": """
+        CREATE TRIGGER reviews_title_fts_ad AFTER DELETE ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts(
+                reviews_title_fts, rowid, name, description
+            )
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    "reviews_title_fts_au": """
+        CREATE TRIGGER reviews_title_fts_au
+        AFTER UPDATE OF name, description ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts(
+                reviews_title_fts, rowid, name, description
+            )
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO reviews_title_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+
+def fts_available(using=connection):
+    return using.vendor == "sqlite"
+
+
+def install_title_search(using=connection):
+    """
+    Создаёт индекс FTS5 по названию и описанию произведений и триггеры
+    его синхронизации.
+
+    SQLite удаляет триггеры при пересоздании таблицы в миграциях, поэтому
+    функция вызывается после каждой миграции и заново строит индекс, если
+    триггеров не было.
+    """
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'reviews_title'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if set(FTS_TRIGGERS) <= existing:
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, description, content='reviews_title', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        for name, sql in FTS_TRIGGERS.items():
+            if name not in existing:
+                cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def match_expression(value):
+    """
+    Превращает пользовательский запрос в выражение MATCH: каждое слово
+    ищется по префиксу, все слова обязательны.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", value))
+
+
+def search_titles(queryset, value):
+    """
+    Фильтрует произведения по полнотекстовому запросу.
+
+    На SQLite произведения соединяются с индексом FTS5 в одном запросе и
+    упорядочиваются по BM25 (совпадение в названии весит больше, чем в
+    описании), поэтому число результатов и пагинация не ограничены. На
+    других СУБД выполняется поиск по вхождению всех слов.
+    """
+    words = re.findall(r"\w+", value)
+    if not words:
+        return queryset.none()
+    if not fts_available():
+        for word in words:
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f"{FTS_TABLE}.rowid = {queryset.model._meta.db_table}.id",
+            f"{FTS_TABLE} MATCH %s",
+        ],
+        params=[match_expression(value)],
+    ).order_by(RawSQL(f"bm25({FTS_TABLE}, 10.0, 1.0)", ()))
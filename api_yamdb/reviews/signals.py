@@ -0,0 +1,249 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+
+from reviews.counters import update_comments_count
+from reviews.leaderboards import refresh_title_leaderboards
+from reviews.models import Comment, Review, SimilarTitle, Title, TitleGenre
+from reviews.ratings import update_title_rating
+from reviews.search import install_title_search
+from reviews.similarity import enqueue_similar_titles
+from reviews.trending import add_activity
+
+# Отправляется командами пересчёта и импорта, которые меняют данные
+# массовыми запросами в обход сигналов моделей.
+data_rebuilt = Signal()
+
+
+def install_search_index(sender, using, **kwargs):
+    """
+    Восстанавливает полнотекстовый индекс произведений после миграций.
+    """
+    install_title_search(connections[using])
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    """
+    Запоминает оценку и произведение отзыва до его изменения.
+    """
+    instance._previous_rating = None
+    if instance.pk is not None:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("title_id", "score")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Обновляет рейтинг произведения после создания или изменения отзыва.
+    """
+    previous = getattr(instance, "_previous_rating", None)
+    if created or previous is None:
+        update_title_rating(
+            instance.title_id, instance.score, 1, {instance.score: 1}
+        )
+        return
+    previous_title_id, previous_score = previous
+    if previous_title_id != instance.title_id:
+        update_title_rating(
+            previous_title_id, -previous_score, -1, {previous_score: -1}
+        )
+        update_title_rating(
+            instance.title_id, instance.score, 1, {instance.score: 1}
+        )
+    elif previous_score != instance.score:
+        update_title_rating(
+            instance.title_id,
+            instance.score - previous_score,
+            histogram={previous_score: -1, instance.score: 1},
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Обновляет рейтинг произведения после удаления отзыва.
+    """
+    update_title_rating(
+        instance.title_id, -instance.score, -1, {instance.score: -1}
+    )
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def refresh_review_leaderboards(sender, instance, **kwargs):
+    """
+    Обновляет позиции произведения в рейтингах после изменения отзыва.
+
+    Выполняется после пересчёта рейтинга, поэтому читает уже
+    сохранённые в Title значения.
+    """
+    title_ids = {instance.title_id}
+    previous = getattr(instance, "_previous_rating", None)
+    if previous is not None:
+        title_ids.add(previous[0])
+    refresh_title_leaderboards(title_ids)
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_scopes(sender, instance, created, **kwargs):
+    """
+    Переносит произведение в рейтинги новой категории или года.
+    """
+    if not created:
+        refresh_title_leaderboards([instance.pk])
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def refresh_title_genre_scopes(sender, instance, **kwargs):
+    refresh_title_leaderboards([instance.title_id_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def remember_cleared_titles(sender, instance, action, reverse, **kwargs):
+    """
+    Запоминает произведения жанра перед удалением всех его связей.
+    """
+    if reverse and action == "pre_clear":
+        instance._cleared_title_ids = list(
+            instance.titles.values_list("pk", flat=True)
+        )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_title_genres_scopes(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    """
+    Обновляет рейтинги жанров при изменении жанров произведения.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        refresh_title_leaderboards([instance.pk])
+    elif pk_set:
+        refresh_title_leaderboards(pk_set)
+    else:
+        refresh_title_leaderboards(
+            getattr(instance, "_cleared_title_ids", [])
+        )
+
+
+@receiver(post_save, sender=Review)
+def count_review_activity(sender, instance, created, **kwargs):
+    """
+    Учитывает новый отзыв в счётчике популярности произведения.
+    """
+    if created:
+        add_activity(
+            Title.objects.filter(pk=instance.title_id),
+            instance.pub_date,
+            settings.TRENDING_REVIEW_WEIGHT,
+        )
+
+
+@receiver(post_delete, sender=Review)
+def discount_review_activity(sender, instance, **kwargs):
+    """
+    Вычитает удалённый отзыв с весом на дату его публикации.
+    """
+    add_activity(
+        Title.objects.filter(pk=instance.title_id),
+        instance.pub_date,
+        -settings.TRENDING_REVIEW_WEIGHT,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_activity(sender, instance, created, **kwargs):
+    """
+    Учитывает новый комментарий в счётчике популярности произведения.
+    """
+    if created:
+        add_activity(
+            Title.objects.filter(reviews=instance.review_id),
+            instance.pub_date,
+            settings.TRENDING_COMMENT_WEIGHT,
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def discount_comment_activity(sender, instance, **kwargs):
+    """
+    Вычитает удалённый комментарий с весом на дату его публикации.
+    """
+    add_activity(
+        Title.objects.filter(reviews=instance.review_id),
+        instance.pub_date,
+        -settings.TRENDING_COMMENT_WEIGHT,
+    )
+
+
+@receiver(post_save, sender=Review)
+def queue_saved_review_similar_titles(sender, instance, created, **kwargs):
+    """
+    Ставит в очередь пересчёт похожих после появления отзыва или его
+    переноса; изменение одной оценки на близость не влияет.
+    """
+    previous = getattr(instance, "_previous_rating", None)
+    if created or previous is None:
+        enqueue_similar_titles([instance.title_id])
+    elif previous[0] != instance.title_id:
+        enqueue_similar_titles([previous[0], instance.title_id])
+
+
+@receiver(post_delete, sender=Review)
+def queue_deleted_review_similar_titles(sender, instance, **kwargs):
+    enqueue_similar_titles([instance.title_id])
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def queue_title_genre_similar_titles(sender, instance, **kwargs):
+    enqueue_similar_titles([instance.title_id_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def queue_title_genres_similar_titles(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        enqueue_similar_titles([instance.pk])
+    elif pk_set:
+        enqueue_similar_titles(pk_set)
+    else:
+        enqueue_similar_titles(getattr(instance, "_cleared_title_ids", []))
+
+
+@receiver(pre_delete, sender=Title)
+def queue_deleted_title_similar_titles(sender, instance, **kwargs):
+    """
+    Ставит в очередь произведения, у которых удаляемое было в списке
+    похожих: их записи удалит каскад, и место нужно заполнить.
+    """
+    enqueue_similar_titles(
+        SimilarTitle.objects.filter(similar=instance).values_list(
+            "title_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    """
+    Увеличивает счётчик комментариев отзыва после создания комментария.
+    """
+    if created:
+        update_comments_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def discount_comment(sender, instance, **kwargs):
+    update_comments_count(instance.review_id, -1)
@@ -0,0 +1,337 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations, islice
+from math import sqrt
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from reviews.models import (Review, SimilarTitle, SimilarTitleUpdate, Title,
+                            TitleGenre)
+
+BATCH_SIZE = 1000
+
+
+def similarity(co_reviews, reviews, other_reviews, shared_genres, genres,
+               other_genres):
+    """
+    Возвращает близость двух произведений.
+
+    Складывает косинусную меру по общим авторам отзывов и меру Жаккара
+    по общим жанрам с весами SIMILAR_REVIEW_WEIGHT и
+    SIMILAR_GENRE_WEIGHT.
+    """
+    score = 0.0
+    if co_reviews:
+        score += settings.SIMILAR_REVIEW_WEIGHT * co_reviews / sqrt(
+            reviews * other_reviews
+        )
+    if shared_genres:
+        score += settings.SIMILAR_GENRE_WEIGHT * shared_genres / (
+            genres + other_genres - shared_genres
+        )
+    return score
+
+
+def top_neighbours(title_id, co_reviews, shared_genres, review_counts,
+                   genre_counts, model=SimilarTitle):
+    """
+    Выбирает SIMILAR_TITLES_LIMIT самых близких произведений.
+
+    Returns:
+    - list: Несохранённые объекты model.
+    """
+    scores = (
+        (
+            similarity(
+                co_reviews[other],
+                review_counts[title_id],
+                review_counts[other],
+                shared_genres[other],
+                genre_counts[title_id],
+                genre_counts[other],
+            ),
+            other,
+        )
+        for other in co_reviews.keys() | shared_genres.keys()
+    )
+    return [
+        model(title_id=title_id, similar_id=other, score=score)
+        for score, other in heapq.nlargest(
+            settings.SIMILAR_TITLES_LIMIT,
+            scores,
+            key=lambda item: (item[0], -item[1]),
+        )
+    ]
+
+
+def pair_counts(groups):
+    """
+    Считает, сколько раз каждая пара произведений встретилась в группах.
+    """
+    counts = defaultdict(Counter)
+    for title_ids in groups:
+        for first, second in combinations(sorted(set(title_ids)), 2):
+            counts[first][second] += 1
+            counts[second][first] += 1
+    return counts
+
+
+def genre_candidates(genre_titles, review_counts):
+    """
+    Выбирает в каждом жанре SIMILAR_GENRE_CANDIDATES произведений с
+    наибольшим числом отзывов.
+
+    Близость по жанрам считается только с ними и с произведениями с
+    общими авторами отзывов, поэтому пары внутри большого жанра не
+    перебираются.
+
+    Returns:
+    - dict: Списки id произведений по id жанра.
+    """
+    return {
+        genre_id: heapq.nsmallest(
+            settings.SIMILAR_GENRE_CANDIDATES,
+            set(title_ids),
+            key=lambda title_id: (-review_counts.get(title_id, 0), title_id),
+        )
+        for genre_id, title_ids in genre_titles.items()
+    }
+
+
+def similar_title_entries(reviews, title_genres, review_counts,
+                          model=SimilarTitle):
+    """
+    Строит индекс похожих произведений за один проход по отзывам и
+    связям с жанрами.
+
+    Parameters:
+    - reviews: Пары (id произведения, id автора отзыва).
+    - title_genres: Пары (id произведения, id жанра).
+    - review_counts: Число отзывов каждого произведения.
+    - model: Модель записей индекса.
+
+    Returns:
+    - generator: Несохранённые объекты model.
+    """
+    reviewed = defaultdict(list)
+    for title_id, author_id in reviews:
+        reviewed[author_id].append(title_id)
+    genres = defaultdict(set)
+    genre_titles = defaultdict(list)
+    for title_id, genre_id in title_genres:
+        genres[title_id].add(genre_id)
+        genre_titles[genre_id].append(title_id)
+    co_reviews = pair_counts(reviewed.values())
+    top_titles = genre_candidates(genre_titles, review_counts)
+    genre_counts = Counter(
+        {title_id: len(genre_ids) for title_id, genre_ids in genres.items()}
+    )
+    for title_id in review_counts:
+        candidates = set(co_reviews[title_id])
+        for genre_id in genres[title_id]:
+            candidates.update(top_titles[genre_id])
+        candidates.discard(title_id)
+        shared_genres = Counter()
+        for other in candidates:
+            shared = len(genres[title_id] & genres[other])
+            if shared:
+                shared_genres[other] = shared
+        yield from top_neighbours(
+            title_id,
+            co_reviews[title_id],
+            shared_genres,
+            review_counts,
+            genre_counts,
+            model,
+        )
+
+
+def rebuild_similar_titles(batch_size=BATCH_SIZE):
+    """
+    Строит индекс похожих произведений по всем отзывам и жанрам.
+
+    Общие авторы и жанры считаются в памяти за один проход по таблицам
+    отзывов и связей с жанрами, затем индекс целиком заменяется в одной
+    транзакции.
+
+    Returns:
+    - int: Количество сохранённых пар.
+    """
+    entries = similar_title_entries(
+        Review.objects.values_list("title_id", "author_id").iterator(),
+        TitleGenre.objects.values_list(
+            "title_id_id", "genre_id_id"
+        ).iterator(),
+        dict(Title.objects.values_list("pk", "rating_count")),
+    )
+    created = 0
+    with transaction.atomic():
+        SimilarTitle.objects.all().delete()
+        while True:
+            batch = list(islice(entries, batch_size))
+            if not batch:
+                return created
+            SimilarTitle.objects.bulk_create(batch)
+            created += len(batch)
+
+
+def genre_top_titles(genre_id):
+    """
+    Возвращает id первых SIMILAR_GENRE_CANDIDATES произведений жанра в
+    порядке genre_candidates.
+    """
+    return (
+        TitleGenre.objects.filter(genre_id=genre_id)
+        .order_by("-title_id__rating_count", "title_id_id")
+        .values_list("title_id", flat=True)[
+            :settings.SIMILAR_GENRE_CANDIDATES
+        ]
+    )
+
+
+def refresh_similar_titles(title_id):
+    """
+    Пересчитывает соседей одного произведения запросами к базе.
+
+    Общие авторы считаются сгруппированным запросом по индексу отзывов,
+    общие жанры - только для них и для первых SIMILAR_GENRE_CANDIDATES
+    произведений каждого жанра произведения, как в
+    rebuild_similar_titles.
+    Списки соседей других произведений обновляет
+    refresh_queued_similar_titles.
+    """
+    co_reviews = Counter(
+        dict(
+            Review.objects.filter(
+                author__in=Review.objects.filter(title_id=title_id).values(
+                    "author"
+                )
+            )
+            .exclude(title_id=title_id)
+            .order_by()
+            .values("title_id")
+            .annotate(count=Count("pk"))
+            .values_list("title_id", "count")
+        )
+    )
+    genre_ids = list(
+        TitleGenre.objects.filter(title_id=title_id).values_list(
+            "genre_id", flat=True
+        )
+    )
+    candidates = set(co_reviews)
+    for genre_id in genre_ids:
+        candidates.update(genre_top_titles(genre_id))
+    candidates.discard(title_id)
+    shared_genres = Counter(
+        dict(
+            TitleGenre.objects.filter(
+                title_id__in=candidates, genre_id__in=genre_ids
+            )
+            .order_by()
+            .values("title_id")
+            .annotate(count=Count("pk"))
+            .values_list("title_id", "count")
+        )
+    )
+    title_ids = co_reviews.keys() | shared_genres.keys() | {title_id}
+    review_counts = dict(
+        Title.objects.filter(pk__in=title_ids).values_list(
+            "pk", "rating_count"
+        )
+    )
+    genre_counts = Counter(
+        dict(
+            TitleGenre.objects.filter(title_id__in=title_ids)
+            .order_by()
+            .values("title_id")
+            .annotate(count=Count("pk"))
+            .values_list("title_id", "count")
+        )
+    )
+    with transaction.atomic():
+        SimilarTitle.objects.filter(title_id=title_id).delete()
+        if title_id in review_counts:
+            SimilarTitle.objects.bulk_create(
+                top_neighbours(
+                    title_id,
+                    co_reviews,
+                    shared_genres,
+                    review_counts,
+                    genre_counts,
+                )
+            )
+
+
+def enqueue_similar_titles(title_ids):
+    """
+    Ставит произведения в очередь пересчёта похожих одним INSERT.
+    """
+    SimilarTitleUpdate.objects.bulk_create(
+        SimilarTitleUpdate(title_id=title_id) for title_id in set(title_ids)
+    )
+
+
+def affected_titles(title_ids):
+    """
+    Возвращает произведения, чьи списки похожих зависят от title_ids.
+
+    Это сами произведения, их кандидаты (произведения с общими авторами
+    отзывов и первые SIMILAR_GENRE_CANDIDATES произведений их жанров) и
+    произведения, у которых они уже есть в списке похожих: близость пары
+    симметрична, поэтому пересчитываются обе стороны. Остальные
+    произведения жанра не затрагиваются; если изменённое произведение
+    вошло в первые произведения жанра, их списки обновит следующий
+    полный пересчёт.
+    """
+    title_ids = set(title_ids)
+    co_reviewed = Review.objects.filter(
+        author__in=Review.objects.filter(title_id__in=title_ids).values(
+            "author"
+        )
+    ).values_list("title_id", flat=True)
+    listed = SimilarTitle.objects.filter(
+        similar_id__in=title_ids
+    ).values_list("title_id", flat=True)
+    affected = set(title_ids)
+    for queryset in (co_reviewed, listed):
+        affected.update(queryset.order_by().distinct())
+    for genre_id in set(
+        TitleGenre.objects.filter(title_id__in=title_ids).values_list(
+            "genre_id", flat=True
+        )
+    ):
+        affected.update(genre_top_titles(genre_id))
+    return affected
+
+
+def refresh_queued_similar_titles():
+    """
+    Обрабатывает очередь пересчёта похожих произведений.
+
+    Пересчитываются списки всех произведений, затронутых изменениями
+    (affected_titles). Если их больше доли SIMILAR_TITLES_REBUILD_SHARE
+    каталога, индекс строится заново целиком. Записи, добавленные в
+    очередь во время пересчёта, остаются до следующего запуска.
+
+    Returns:
+    - int: Количество пересчитанных произведений.
+    """
+    last = SimilarTitleUpdate.objects.order_by("-pk").first()
+    if last is None:
+        return 0
+    queued = SimilarTitleUpdate.objects.filter(pk__lte=last.pk)
+    title_ids = affected_titles(
+        queued.values_list("title_id", flat=True).distinct()
+    )
+    refreshed = Title.objects.count()
+    if len(title_ids) > settings.SIMILAR_TITLES_REBUILD_SHARE * refreshed:
+        rebuild_similar_titles()
+    else:
+        for title_id in title_ids:
+            refresh_similar_titles(title_id)
+        refreshed = len(title_ids)
+    queued.delete()
+    return refreshed
@@ -0,0 +1,134 @@
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Greatest, Log, Power
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+BATCH_SIZE = 1000
+
+# Доля вклада, ниже которой остаток после удаления события считается
+# погрешностью округления, а не активностью.
+RESIDUE = 1e-9
+
+
+def activity_weight(moment, weight):
+    """
+    Возвращает двоичный логарифм вклада события в счётчик популярности
+    (forward decay).
+
+    Вклад растёт вдвое за каждый период полураспада, прошедший с эпохи.
+    Поэтому сохранённые суммы не нужно уменьшать со временем: порядок
+    произведений по сумме совпадает с порядком по затухающей активности.
+    Сами вклады быстро выходят за пределы float, поэтому счётчик хранит
+    двоичный логарифм суммы вкладов: он растёт линейно со временем, а
+    порядок произведений по нему тот же.
+    """
+    age = (moment - settings.TRENDING_EPOCH) / settings.TRENDING_HALF_LIFE
+    return math.log2(weight) + age
+
+
+def log_add(first, second):
+    """
+    Возвращает log2(2 ** first + 2 ** second) без переполнения.
+    """
+    if first is None:
+        return second
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def current_score(stored, now=None):
+    """
+    Приводит сохранённый счётчик к весу событий, произошедших сейчас.
+    """
+    if stored is None:
+        return 0.0
+    return 2 ** (stored - activity_weight(now or timezone.now(), 1))
+
+
+def add_activity(titles, moment, weight):
+    """
+    Прибавляет вклад события к счётчикам произведений одним UPDATE.
+
+    Сложение и вычитание выполняются над логарифмами в самом запросе.
+    Если после вычитания остаётся меньше доли RESIDUE от вычтенного
+    вклада, счётчик сбрасывается в NULL, чтобы погрешность не оставляла
+    произведение в списке популярных.
+
+    Parameters:
+    - titles: QuerySet произведений, к которым относится событие.
+    - moment: Время события.
+    - weight: Вес события; для отмены события передаётся со знаком минус.
+    """
+    event = activity_weight(moment, abs(weight))
+    score = F("trending_score")
+    if weight > 0:
+        value = Case(
+            When(trending_score__isnull=True, then=Value(event)),
+            default=Greatest(score, Value(event)) + Log(
+                2, 1 + Power(2, -Abs(score - Value(event)))
+            ),
+            output_field=FloatField(),
+        )
+    else:
+        value = Case(
+            When(
+                trending_score__lt=event - math.log2(1 - RESIDUE),
+                then=Value(None),
+            ),
+            default=score + Log(2, 1 - Power(2, Value(event) - score)),
+            output_field=FloatField(),
+        )
+    titles.update(trending_score=value)
+
+
+def trending_scores(reviews, comments):
+    """
+    Суммирует вклад отзывов и комментариев по произведениям.
+
+    Parameters:
+    - reviews: Пары (id произведения, дата отзыва).
+    - comments: Пары (id произведения, дата комментария).
+
+    Returns:
+    - dict: Логарифм счётчика популярности для каждого произведения.
+    """
+    scores = {}
+    for events, weight in (
+        (reviews, settings.TRENDING_REVIEW_WEIGHT),
+        (comments, settings.TRENDING_COMMENT_WEIGHT),
+    ):
+        for title_id, pub_date in events:
+            scores[title_id] = log_add(
+                scores.get(title_id), activity_weight(pub_date, weight)
+            )
+    return scores
+
+
+def rebuild_trending(batch_size=BATCH_SIZE):
+    """
+    Пересчитывает счётчики популярности по истории отзывов и
+    комментариев.
+
+    Returns:
+    - int: Количество произведений с активностью.
+    """
+    scores = trending_scores(
+        Review.objects.values_list("title_id", "pub_date").iterator(),
+        Comment.objects.values_list("review__title_id", "pub_date").iterator(),
+    )
+    with transaction.atomic():
+        Title.objects.update(trending_score=None)
+        Title.objects.bulk_update(
+            [
+                Title(pk=title_id, trending_score=score)
+                for title_id, score in scores.items()
+            ],
+            ["trending_score"],
+            batch_size=batch_size,
+        )
+    return len(scores)
@@ -0,0 +1,79 @@
+import pytest
+from django.core.cache import cache
+
+from api.autocomplete import index as autocomplete_index
+from api.cache import clear_slug_caches
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+
+
+@pytest.fixture
+def seed_objects(django_user_model):
+    """
+    Фабрика, добавляющая в базу по `count` объектов каждого типа.
+
+    Все отзывы оставлены к первому произведению, все комментарии - к
+    первому отзыву, чтобы вложенные списки росли вместе с `count`.
+    Возвращает аргументы для построения URL детальных маршрутов.
+    """
+    created = {'count': 0}
+
+    def seed(count):
+        start = created['count']
+        created['count'] += count
+        for idx in range(start, start + count):
+            author = django_user_model.objects.create_user(
+                username=f'seed-user-{idx}',
+                email=f'seed-user-{idx}@yamdb.fake',
+            )
+            category = Category.objects.create(
+                name=f'Категория {idx}', slug=f'seed-category-{idx}'
+            )
+            Genre.objects.create(
+                name=f'Жанр {idx}', slug=f'seed-genre-{idx}'
+            )
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title_id=title, genre_id=genre)
+                for genre in Genre.objects.order_by('id')[:3]
+            )
+            Review.objects.create(
+                title=Title.objects.order_by('id').first(),
+                author=author,
+                text='text',
+                score=5,
+            )
+            first_review = Review.objects.order_by('id').first()
+            Comment.objects.create(
+                review=first_review, author=author, text='text'
+            )
+        title = Title.objects.order_by('id').first()
+        review = Review.objects.order_by('id').first()
+        return {
+            'titles-detail': {'pk': title.id},
+            'titles-similar': {'pk': title.id},
+            'users-detail': {'username': review.author.username},
+            'reviews-list': {'title_id': title.id},
+            'reviews-detail': {'title_id': title.id, 'pk': review.id},
+            'comments-list': {'title_id': title.id, 'review_id': review.id},
+            'comments-detail': {
+                'title_id': title.id,
+                'review_id': review.id,
+                'pk': review.comments.order_by('id').first().id,
+            },
+        }
+
+    return seed
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш и индексы процесса не должны переживать очистку базы."""
+    cache.clear()
+    autocomplete_index.clear()
+    clear_slug_caches()
+    yield
+    cache.clear()
+    autocomplete_index.clear()
+    clear_slug_caches()
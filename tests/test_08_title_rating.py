@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+
+from reviews.models import Title
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+def annotated_ratings():
+    return dict(
+        Title.objects.annotate(
+            expected=Avg('reviews__score')
+        ).values_list('id', 'expected')
+    )
+
+
+def stored_ratings():
+    return dict(Title.objects.values_list('id', 'rating'))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_follows_reviews(self, admin_client, admin,
+                                       user_client, user, moderator_client,
+                                       moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        assert stored_ratings() == annotated_ratings(), (
+            'Проверьте, что сохранённый рейтинг произведения совпадает со '
+            'средней оценкой его отзывов после создания отзывов.'
+        )
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        response = admin_client.patch(url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert stored_ratings() == annotated_ratings(), (
+            'Проверьте, что сохранённый рейтинг произведения обновляется '
+            'при изменении оценки отзыва.'
+        )
+        for review in reviews:
+            response = admin_client.delete(
+                self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id'], review_id=review['id']
+                )
+            )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+        assert stored_ratings() == annotated_ratings(), (
+            'Проверьте, что после удаления всех отзывов рейтинг '
+            'произведения равен `None`.'
+        )
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (0, 0)
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin, user_client,
+                                        user):
+        author_map = {admin: admin_client, user: user_client}
+        create_reviews(admin_client, author_map)
+        expected = stored_ratings()
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings')
+        assert stored_ratings() == expected == annotated_ratings(), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'рейтинги произведений по таблице отзывов.'
+        )
+
+    def test_03_stale_title_save_keeps_counters(self, admin_client,
+                                                user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        stale = Title.objects.get(pk=title_id)
+        create_single_review(user_client, title_id, 'text', 9)
+        stale.name = 'Терминатор 2'
+        stale.save()
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/', data={'year': 1991}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get(pk=title_id)
+        assert (
+            title.name, title.year, title.rating, title.rating_count,
+            title.score_9_count
+        ) == ('Терминатор 2', 1991, 9, 1, 1), (
+            'Проверьте, что изменение произведения не перезаписывает '
+            'счётчики оценок значениями из загруженного ранее объекта.'
+        )
@@ -0,0 +1,58 @@
+import pytest
+
+from reviews.models import Category, Genre, Title, TitleGenre
+
+
+def create_catalogue(count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(count)
+    )
+    titles = Title.objects.all()
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title_id=title, genre_id=genre)
+        for title in titles
+        for genre in genres
+    )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    # Версии для ETag, COUNT, выборка страницы с категориями, выборка
+    # жанров.
+    LIST_QUERIES = 4
+    # Версии для ETag, выборка произведения с категорией, выборка жанров.
+    DETAIL_QUERIES = 3
+
+    @pytest.mark.parametrize('count', (1, 10, 25))
+    def test_01_title_list_queries(self, client, count,
+                                   django_assert_num_queries):
+        create_catalogue(count)
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == min(count, 10), (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'страницу произведений.'
+        )
+
+    def test_02_title_detail_queries(self, client,
+                                     django_assert_num_queries):
+        title = create_catalogue(1)[0]
+        with django_assert_num_queries(self.DETAIL_QUERIES):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert len(response.json()['genre']) == 3, (
+            f'Проверьте, что ответ на GET-запрос к '
+            f'`{self.TITLES_DETAIL_URL_TEMPLATE}` содержит жанры '
+            'произведения.'
+        )
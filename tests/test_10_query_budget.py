@@ -0,0 +1,60 @@
+import pytest
+
+from api.urls import router_v1
+from tests.utils import collect_router_routes, count_route_queries
+
+# Допустимое число SQL-запросов на GET-запрос администратора к маршруту,
+# включая запрос пользователя при JWT-аутентификации. Новый маршрут в
+# `router_v1` должен объявить здесь свой бюджет.
+QUERY_BUDGETS = {
+    'categories-list': 4,
+    'genres-list': 4,
+    'titles-list': 5,
+    'titles-detail': 4,
+    'titles-trending': 4,
+    'titles-similar': 3,
+    'users-list': 3,
+    'users-detail': 2,
+    'users-get-patch-me-user': 1,
+    'reviews-list': 5,
+    'reviews-detail': 4,
+    'comments-list': 5,
+    'comments-detail': 4,
+}
+SMALL_SEED = 2
+LARGE_SEED = 12
+ROUTES = collect_router_routes(router_v1)
+
+
+def test_01_every_route_has_budget():
+    missing = sorted(set(ROUTES) - set(QUERY_BUDGETS))
+    assert not missing, (
+        'Объявите бюджет SQL-запросов в `QUERY_BUDGETS` для маршрутов: '
+        f'{", ".join(missing)}.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('route_name', sorted(ROUTES))
+def test_02_route_query_budget(route_name, admin_client, seed_objects):
+    route_kwargs = seed_objects(SMALL_SEED)
+    _, small_queries = count_route_queries(
+        admin_client, route_name, route_kwargs.get(route_name, {})
+    )
+    route_kwargs = seed_objects(LARGE_SEED - SMALL_SEED)
+    url, large_queries = count_route_queries(
+        admin_client, route_name, route_kwargs.get(route_name, {})
+    )
+    assert len(large_queries) == len(small_queries), (
+        f'Число SQL-запросов GET-запроса к `{url}` растёт вместе с '
+        f'количеством объектов: {len(small_queries)} при {SMALL_SEED}, '
+        f'{len(large_queries)} при {LARGE_SEED}. Проверьте '
+        '`select_related`/`prefetch_related`.\n' + '\n'.join(large_queries)
+    )
+    budget = QUERY_BUDGETS.get(route_name)
+    if budget is not None:
+        assert len(large_queries) <= budget, (
+            f'GET-запрос к `{url}` выполняет {len(large_queries)} '
+            f'SQL-запросов, бюджет маршрута `{route_name}` - {budget}.\n'
+            + '\n'.join(large_queries)
+        )
@@ -0,0 +1,99 @@
+import pytest
+from django.utils import timezone
+
+from reviews.models import Category, Comment, Review, Title
+
+
+def walk(client, url, link_key):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора ответ не содержит ключ `count`.'
+        )
+        pages.append([obj['id'] for obj in data['results']])
+        url = data[link_key]
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def review_title(self, django_user_model):
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(
+            name='Терминатор', year=1984, category=category
+        )
+        for idx in range(25):
+            author = django_user_model.objects.create_user(
+                username=f'author-{idx}', email=f'author-{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='text', score=5
+            )
+            Comment.objects.create(
+                review=Review.objects.order_by('id').first(),
+                author=author,
+                text='text',
+            )
+        # Одинаковые даты проверяют добор ключа по `id`.
+        same_date = timezone.now()
+        Review.objects.filter(id__lte=review.id - 10).update(
+            pub_date=same_date
+        )
+        Comment.objects.update(pub_date=same_date)
+        return title
+
+    def test_01_reviews_cursor_walk(self, client, review_title):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=review_title.id)
+        expected = list(
+            Review.objects.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        pages = walk(client, url + '?pagination=cursor', 'next')
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sum(pages, []) == expected, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает отзывы '
+            'по порядку (pub_date, id) без пропусков и повторов.'
+        )
+        response = client.get(url + '?pagination=cursor')
+        last_page = client.get(response.json()['next']).json()
+        last_page = client.get(last_page['next']).json()
+        back_pages = walk(client, last_page['previous'], 'previous')
+        assert sum(reversed(back_pages), []) == expected[:20], (
+            'Проверьте, что ссылка `previous` курсорной пагинации ведёт на '
+            'предыдущие страницы.'
+        )
+
+    def test_02_comments_cursor_walk(self, client, review_title):
+        review = Review.objects.order_by('id').first()
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=review_title.id, review_id=review.id
+        )
+        pages = walk(client, url + '?pagination=cursor', 'next')
+        assert sum(pages, []) == sorted(
+            Comment.objects.values_list('id', flat=True)
+        ), (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает '
+            'комментарии по порядку (pub_date, id).'
+        )
+
+    def test_03_invalid_cursor(self, client, review_title):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=review_title.id)
+        response = client.get(url + '?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
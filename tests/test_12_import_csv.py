@@ -0,0 +1,142 @@
+import csv
+import shutil
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.management.commands import import_csv
+from reviews.models import (Comment, Genre, ImportCheckpoint, Review,
+                            Title, TitleGenre)
+
+
+def csv_rows(path):
+    with open(path, encoding='utf8', newline='') as csvfile:
+        return sum(1 for _ in csv.DictReader(csvfile))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for spec in import_csv.IMPORTS:
+        shutil.copy(import_csv.DATA_DIR / spec.filename, tmp_path)
+    monkeypatch.setattr(import_csv, 'DATA_DIR', tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ImportCsv:
+
+    def test_01_import_all_files(self, data_dir):
+        call_command('import_csv')
+        for spec in import_csv.IMPORTS:
+            expected = csv_rows(data_dir / spec.filename)
+            assert spec.model.objects.count() == expected, (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'файла `{spec.filename}`.'
+            )
+        title = Title.objects.get(id=1)
+        scores = Review.objects.filter(title=title).values_list(
+            'score', flat=True
+        )
+        assert title.rating == sum(scores) / len(scores), (
+            'Проверьте, что после импорта рейтинги произведений '
+            'пересчитаны.'
+        )
+
+    def test_02_dangling_references_fail(self, data_dir):
+        with pytest.raises(CommandError):
+            call_command('import_csv', only=['review'], batch_size=7)
+        assert not Review.objects.exists()
+        assert ImportCheckpoint.objects.get(filename='review.csv').rows == 0, (
+            'Проверьте, что `import_csv` не продвигает контрольную точку '
+            'за строки со ссылками на несуществующие записи.'
+        )
+        call_command('import_csv', skip=['review', 'comments'])
+        call_command('import_csv', only=['review', 'comments'])
+        assert Review.objects.count() == csv_rows(data_dir / 'review.csv'), (
+            'Проверьте, что после загрузки недостающих файлов повторный '
+            'запуск загружает отзывы.'
+        )
+        with open(data_dir / 'comments.csv', 'a', encoding='utf8') as file:
+            file.write('\n100000,99999,text,100,2020-01-13T23:20:02.422Z\n')
+        with pytest.raises(CommandError, match='review_id=99999'):
+            call_command('import_csv', only=['comments'])
+
+    def test_03_resume_after_failure(self, data_dir, monkeypatch):
+        original = import_csv.dangling_references
+        calls = {'review': 0}
+
+        def failing_dangling_references(objs, references):
+            if objs and isinstance(objs[0], Review):
+                calls['review'] += 1
+                if calls['review'] == 3:
+                    raise RuntimeError('crash')
+            return original(objs, references)
+
+        monkeypatch.setattr(
+            import_csv, 'dangling_references', failing_dangling_references
+        )
+        with pytest.raises(RuntimeError):
+            call_command('import_csv', batch_size=10)
+        assert Review.objects.count() == 20, (
+            'Проверьте, что `import_csv` фиксирует каждую пачку в '
+            'отдельной транзакции.'
+        )
+        assert ImportCheckpoint.objects.get(filename='review.csv').rows == 20
+
+        monkeypatch.setattr(import_csv, 'dangling_references', original)
+        call_command('import_csv', batch_size=10)
+        assert Review.objects.count() == csv_rows(data_dir / 'review.csv'), (
+            'Проверьте, что повторный запуск `import_csv` продолжает '
+            'загрузку с контрольной точки.'
+        )
+        call_command('import_csv', batch_size=10)
+        assert Review.objects.count() == csv_rows(data_dir / 'review.csv')
+
+    def test_04_only_and_skip(self, data_dir):
+        call_command('import_csv', only=['genre.csv', 'users'])
+        assert Genre.objects.exists()
+        assert not Title.objects.exists(), (
+            'Проверьте, что `import_csv --only` загружает только указанные '
+            'файлы.'
+        )
+        call_command('import_csv', skip=['comments'])
+        assert Review.objects.exists()
+        assert not Comment.objects.exists(), (
+            'Проверьте, что `import_csv --skip` пропускает указанные файлы.'
+        )
+        with pytest.raises(CommandError):
+            call_command('import_csv', only=['unknown'])
+
+    def test_05_dependency_order(self):
+        graph = import_csv.dependency_graph(import_csv.IMPORTS)
+        assert graph['users'] == graph['category'] == graph['genre'] == set()
+        assert graph['titles'] == {'category'}
+        assert graph['review'] == {'titles', 'users'}
+        assert graph['genre_title'] == {'titles', 'genre'}
+        assert graph['comments'] == {'review', 'users'}, (
+            'Проверьте, что граф зависимостей `import_csv` следует '
+            'внешним ключам моделей.'
+        )
+
+    def test_06_parallel_equals_serial(self, data_dir):
+        def snapshot():
+            # pub_date заполняется при вставке (auto_now_add).
+            return {
+                spec.filename: list(
+                    spec.model.objects.order_by('pk').values_list(
+                        *(field for field in spec.columns
+                          if field != 'pub_date')
+                    )
+                )
+                for spec in import_csv.IMPORTS
+            }
+
+        call_command('import_csv', workers=1, batch_size=5)
+        serial = snapshot()
+        for spec in reversed(import_csv.IMPORTS):
+            spec.model.objects.all().delete()
+        call_command('import_csv', workers=4, batch_size=5, reset=True)
+        assert snapshot() == serial, (
+            'Проверьте, что параллельная загрузка `import_csv` приводит '
+            'базу в то же состояние, что и последовательная.'
+        )
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.fixture
+def catalogue(admin_client, admin, user_client, user):
+    return create_comments(admin_client, {admin: admin_client,
+                                          user: user_client})
+
+
+def streamed(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{resource}/'
+
+    def test_01_export_command_ndjson(self, catalogue, capsys):
+        _, _, titles = catalogue
+        call_command('export_data', 'titles')
+        rows = [
+            json.loads(line)
+            for line in capsys.readouterr().out.splitlines()
+        ]
+        assert [row['id'] for row in rows] == sorted(
+            Title.objects.values_list('id', flat=True)
+        ), (
+            'Проверьте, что команда `export_data titles` выгружает все '
+            'произведения.'
+        )
+        first = next(row for row in rows if row['id'] == titles[0]['id'])
+        assert sorted(first['genre']) == sorted(titles[0]['genre'])
+        assert first['category'] == titles[0]['category']
+        assert first['rating'] == Title.objects.get(id=first['id']).rating
+
+    def test_02_export_command_csv_file(self, catalogue, tmp_path):
+        output = tmp_path / 'reviews.csv'
+        call_command('export_data', 'reviews', export_format='csv',
+                     output=str(output), chunk_size=1)
+        with open(output, encoding='utf8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert len(rows) == Review.objects.count(), (
+            'Проверьте, что команда `export_data reviews --format csv` '
+            'выгружает все отзывы.'
+        )
+
+    def test_03_export_endpoint(self, catalogue, admin_client, user_client):
+        url = self.EXPORT_URL_TEMPLATE.format(resource='comments')
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{url}` отдаёт выгрузку потоком.'
+        )
+        lines = streamed(response).splitlines()
+        assert len(lines) == Comment.objects.count()
+
+        response = admin_client.get(url, {'type': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(streamed(response))))
+        assert len(rows) == Comment.objects.count()
+        assert response['Content-Type'].startswith('text/csv')
+
+        response = admin_client.get(url, {'type': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource='users')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
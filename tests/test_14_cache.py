@@ -0,0 +1,240 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import title_cache_stats
+from reviews.models import Category, Genre, Review, Title
+from tests.utils import (create_categories, create_genre,
+                         create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Cache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRE_URL = '/api/v1/genres/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_catalogue_lists_cached(self, client, admin_client,
+                                       django_assert_num_queries):
+        create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+        client.get(self.CATEGORY_URL, {'search': 'Книги'})
+        with django_assert_num_queries(2):
+            response = client.get(self.CATEGORY_URL)
+            search = client.get(self.CATEGORY_URL, {'search': 'Книги'})
+        assert response.json()['count'] == 2, (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORY_URL}` '
+            'отдаётся из кэша с одним запросом версии справочника.'
+        )
+        assert search.json()['count'] == 1
+
+        data = {'name': 'Музыка', 'slug': 'music'}
+        response = admin_client.post(self.CATEGORY_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(self.CATEGORY_URL).json()['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кэш списка.'
+        )
+        response = admin_client.delete(f'{self.CATEGORY_URL}music/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(self.CATEGORY_URL).json()['count'] == 2, (
+            'Проверьте, что удаление категории сбрасывает кэш списка.'
+        )
+
+    def test_02_admin_changes_invalidate(self, client, admin_client):
+        create_genre(admin_client)
+        assert client.get(self.GENRE_URL).json()['count'] == 3
+        Genre.objects.filter(slug='drama').get().delete()
+        assert client.get(self.GENRE_URL).json()['count'] == 2, (
+            'Проверьте, что удаление жанра вне API (например, в админке) '
+            'сбрасывает кэш списка.'
+        )
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        names = [
+            obj['name'] for obj in client.get(self.GENRE_URL).json()['results']
+        ]
+        assert 'Хоррор' in names, (
+            'Проверьте, что изменение жанра сбрасывает кэш списка.'
+        )
+
+    def test_03_title_detail_cached(self, client, admin_client, user_client,
+                                    django_assert_num_queries):
+        titles, _, genres = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        client.get(url)
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+            'кэша с одним запросом версий.'
+        )
+        assert title_cache_stats()['hits'] == 1
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+        admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        assert [
+            genre['slug'] for genre in client.get(url).json()['genre']
+        ] == [genres[2]['slug']], (
+            'Проверьте, что изменение жанров сбрасывает кэш произведения.'
+        )
+        category = Category.objects.get(slug=titles[0]['category'])
+        category.name = 'Кино'
+        category.save()
+        assert client.get(url).json()['category']['name'] == 'Кино', (
+            'Проверьте, что переименование категории сбрасывает кэш '
+            'произведения.'
+        )
+        genre = Genre.objects.get(slug=genres[2]['slug'])
+        genre.name = 'Трагедия'
+        genre.save()
+        assert client.get(url).json()['genre'][0]['name'] == 'Трагедия'
+        genre.delete()
+        assert client.get(url).json()['genre'] == []
+        Title.objects.get(id=titles[0]['id']).delete()
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_conditional_get(self, client, admin_client, user_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 7
+        ).json()
+        urls = (
+            '/api/v1/titles/',
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+            'comments/',
+        )
+        validators = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок ETag.'
+            )
+            assert response.has_header('Last-Modified')
+            validators[url] = response['ETag']
+            with django_assert_num_queries(1):
+                response = client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+
+        create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'comment'
+        )
+        changed = {
+            url: client.get(
+                url, HTTP_IF_NONE_MATCH=validators[url]
+            ).status_code
+            for url in urls
+        }
+        assert changed[urls[4]] == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка '
+            'комментариев.'
+        )
+        assert changed[urls[1]] == HTTPStatus.NOT_MODIFIED
+        user_client.patch(urls[3], data={'score': 3})
+        for url in urls[:4]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=validators[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что изменение отзыва меняет ETag `{url}`.'
+            )
+        last_modified = client.get(urls[2])['Last-Modified']
+        create_single_review(admin_client, titles[0]['id'], 'text', 5)
+        response = client.get(urls[2], HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что отзыв, добавленный в ту же секунду, не даёт '
+            'ответа 304 по `If-Modified-Since`.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_05_title_cache_stats(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        client.get(url)
+        client.get(url)
+        stats_url = '/api/v1/cache-stats/titles/'
+        assert client.get(stats_url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(stats_url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(stats_url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5
+        }, (
+            'Проверьте, что счётчики кэша произведений доступны '
+            'администратору через API обслуживающего процесса.'
+        )
+        response = admin_client.delete(stats_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert title_cache_stats()['hits'] == 0
+        with pytest.raises(CommandError):
+            call_command('title_cache_stats')
+
+    def test_06_catalogue_and_rebuild_invalidation(self, client,
+                                                   admin_client,
+                                                   user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        client.get(url)
+        category = Category.objects.get(slug=titles[0]['category'])
+        category.name = 'Кино'
+        with CaptureQueriesContext(connection) as context:
+            category.save()
+        assert not [
+            query for query in context.captured_queries
+            if '"reviews_title"' in query['sql']
+        ], (
+            'Проверьте, что переименование категории продвигает версию '
+            'справочника, а не перебирает её произведения.'
+        )
+        assert client.get(url).json()['category']['name'] == 'Кино'
+        create_single_review(user_client, title_id, 'text', 7)
+        assert client.get(url).json()['rating'] == 7
+        Review.objects.update(score=3)
+        call_command('rebuild_ratings')
+        assert client.get(url).json()['rating'] == 3, (
+            'Проверьте, что команды пересчёта сбрасывают кэш произведений.'
+        )
+
+    def test_07_versions_shared_and_rebuilt(self, client, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 7
+        ).json()
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        )
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        cache.clear()
+        for url, etag in etags.items():
+            assert client.get(url)['ETag'] == etag, (
+                'Проверьте, что версии для ETag хранятся в базе и одинаковы '
+                'во всех процессах.'
+            )
+        Review.objects.filter(pk=review['id']).update(score=3)
+        call_command('rebuild_ratings')
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что команды пересчёта меняют ETag ответов: '
+                f'`{url}` вернул 304 после `rebuild_ratings`.'
+            )
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?search=` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.search(client, 'терминат') == ['Терминатор'], (
+            'Проверьте, что параметр `search` ищет произведения по началу '
+            'слов названия.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `search` ищет по описанию.'
+        )
+        assert self.search(client, '!!!') == []
+        assert self.search(client, 'back терминатор') == ['Терминатор']
+
+    def test_02_search_ranking_and_sync(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[1]["id"]}/',
+            data={'description': 'Не терминатор, но тоже хорош'}
+        )
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании.'
+        )
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'name': 'Чужой'}
+        )
+        assert self.search(client, 'чужой') == ['Чужой'], (
+            'Проверьте, что индекс поиска обновляется при изменении '
+            'названия.'
+        )
+        admin_client.delete(f'{self.TITLES_URL}{titles[1]["id"]}/')
+        assert self.search(client, 'терминатор') == []
+
+    def test_03_search_without_limit(self, client, admin_client, settings):
+        create_titles(admin_client)
+        category = Category.objects.get(slug='films')
+        Title.objects.bulk_create(
+            Title(name=f'Звёздный путь {idx}', year=2000 + idx % 2,
+                  description='космос', category=category)
+            for idx in range(25)
+        )
+        Title.objects.create(
+            name='Космос', year=1980, description='звёзды', category=category
+        )
+        response = client.get(
+            self.TITLES_URL,
+            {'search': 'космос', 'page': 3, 'facets': 'year'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 26, (
+            'Проверьте, что число найденных произведений не ограничено.'
+        )
+        assert len(data['results']) == 6
+        assert {'value': 2000, 'count': 13} in data['facets']['year']
+        assert self.search(client, 'космос')[0] == 'Космос', (
+            'Проверьте, что совпадение в названии ранжируется выше.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'search': 'космос', 'ordering': 'year'}
+        )
+        assert response.json()['results'][0]['name'] == 'Космос'
@@ -0,0 +1,190 @@
+import json
+import time
+from http import HTTPStatus
+from random import Random
+
+import pytest
+from django.db import connection
+
+from api.autocomplete import IndexData, name_keys
+from api.autocomplete import index as autocomplete_index
+from api.cache import get_slug_cache
+from reviews.models import Category, Genre, Title, TitleGenre
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Autocomplete:
+
+    AUTOCOMPLETE_URL = '/api/v1/autocomplete/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def suggest(self, client, query, **params):
+        response = client.get(self.AUTOCOMPLETE_URL, {'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.AUTOCOMPLETE_URL}` '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_prefix_matches(self, client, admin_client,
+                               django_assert_num_queries):
+        create_titles(admin_client)
+        data = self.suggest(client, 'КР')
+        assert [title['name'] for title in data['titles']] == [
+            'Крепкий орешек'
+        ], (
+            f'Проверьте, что `{self.AUTOCOMPLETE_URL}?q=` находит '
+            'произведения по началу названия без учёта регистра.'
+        )
+        assert self.suggest(client, 'орешек')['titles'], (
+            'Проверьте, что подсказки находят слова из середины названия.'
+        )
+        assert [genre['slug'] for genre in self.suggest(client, 'ко')[
+            'genres'
+        ]] == ['comedy']
+        assert self.suggest(client, 'кни')['categories'] == [
+            {'name': 'Книги', 'slug': 'books'}
+        ]
+        with django_assert_num_queries(0):
+            self.suggest(client, 'те')
+        assert self.suggest(client, '') == {
+            'titles': [], 'genres': [], 'categories': []
+        }
+
+    def test_02_incremental_updates(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.suggest(client, 'т')['titles']
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Титаник', 'year': 1997, 'genre': ['drama'],
+            'category': 'films'
+        })
+        create_single_review(user_client, titles[0]['id'], 'text', 9)
+        names = [title['name'] for title in self.suggest(client, 'т')[
+            'titles'
+        ]]
+        assert names == ['Терминатор', 'Титаник'], (
+            'Проверьте, что новые произведения попадают в подсказки, а '
+            'порядок учитывает рейтинг.'
+        )
+        assert self.suggest(client, 'т', limit=1)['titles'][0]['rating'] == 9
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert [title['name'] for title in self.suggest(client, 'т')[
+            'titles'
+        ]] == ['Титаник'], (
+            'Проверьте, что удалённые произведения исчезают из подсказок.'
+        )
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        assert self.suggest(client, 'хор')['genres'][0]['slug'] == 'horror'
+        assert self.suggest(client, 'ужас')['genres'] == []
+
+    def test_03_top_lists_stay_exact(self, settings):
+        settings.AUTOCOMPLETE_SCAN_LIMIT = 3
+        settings.AUTOCOMPLETE_MAX_LIMIT = 4
+        random = Random(16)
+        words = ['альфа', 'альт', 'бета', 'бег', 'гамма']
+        data = IndexData()
+        names = {}
+
+        def put(pk):
+            names[pk] = ' '.join(random.sample(words, 2))
+            data.put('titles', pk, names[pk], {'id': pk},
+                     random.randint(0, 10))
+
+        for pk in range(40):
+            put(pk)
+        data.warm(2)
+        for step in range(300):
+            pk = random.randrange(50)
+            action = random.random()
+            if action < 0.2:
+                data.remove('titles', pk)
+                names.pop(pk, None)
+            elif action < 0.5:
+                data.set_score('titles', pk, random.randint(0, 10))
+            else:
+                put(pk)
+            query = random.choice(['а', 'ал', 'альф', 'б', 'бе', 'г'])
+            expected = sorted(
+                (-data.items[('titles', pk)]['score'], pk)
+                for pk, name in names.items()
+                if any(key.startswith(query) for key in name_keys(name))
+            )[:4]
+            found = data.search(query, 4)['titles']
+            assert [item['id'] for item in found] == [
+                pk for _, pk in expected
+            ], (
+                'Проверьте, что списки первых мест для частых префиксов '
+                'остаются точными после изменений.'
+            )
+
+    def test_04_refresh_in_background(self, client, admin_client, settings):
+        create_titles(admin_client)
+        assert self.suggest(client, 'т')['titles']
+        Title.objects.bulk_create([
+            Title(name='Тайна', year=2000, category=Category.objects.first())
+        ])
+        settings.AUTOCOMPLETE_REFRESH_INTERVAL = 0
+        with autocomplete_index.build_lock:
+            names = [title['name'] for title in self.suggest(client, 'та')[
+                'titles'
+            ]]
+            assert names == [], (
+                'Проверьте, что устаревший индекс обновляется в фоне, а '
+                'запросы тем временем получают ответ из старого.'
+            )
+        settings.AUTOCOMPLETE_REFRESH_INTERVAL = 60
+        with autocomplete_index.build_lock:
+            pass
+        while autocomplete_index.refreshing:
+            time.sleep(0.01)
+        assert self.suggest(client, 'та')['titles'][0]['name'] == 'Тайна'
+
+    def test_05_genre_counts_and_rollback(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.suggest(client, 'т')['titles']
+
+        def check_genre_counts():
+            for genre in Genre.objects.all():
+                score = autocomplete_index.data.items[
+                    ('genres', genre.pk)
+                ]['score']
+                assert score == TitleGenre.objects.filter(
+                    genre_id=genre
+                ).count(), (
+                    'Проверьте, что число произведений жанра в подсказках '
+                    'совпадает с базой после изменения жанров.'
+                )
+
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'genre': [titles[0]['genre'][0]]}
+        )
+        check_genre_counts()
+        title = Title.objects.get(pk=titles[1]['id'])
+        title.genre.remove(*title.genre.all())
+        title.genre.add(Genre.objects.get(slug='comedy'))
+        check_genre_counts()
+        admin_client.post(
+            '/api/v1/titles/bulk/',
+            data=json.dumps([{'id': titles[0]['id'], 'genre': ['comedy']}]),
+            content_type='application/json'
+        )
+        check_genre_counts()
+
+        Genre.objects.create(name='Пропавший', slug='stale')
+        get_slug_cache(Genre).get_many(['stale'])
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_genre WHERE slug = %s',
+                           ['stale'])
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Занзибар', 'year': 2000, 'genre': ['stale'],
+            'category': 'films'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert self.suggest(client, 'занз')['titles'] == [], (
+            'Проверьте, что откаченная запись не попадает в подсказки.'
+        )
+        check_genre_counts()
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFacets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_facets(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?facets=` '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_facet_counts(self, client, admin_client):
+        create_titles(admin_client)
+        data = self.get_facets(client, facets='genre,category,year')
+        assert len(data['results']) == 2
+        assert data['facets'] == {
+            'genre': [
+                {'value': 'comedy', 'count': 1},
+                {'value': 'drama', 'count': 1},
+                {'value': 'horror', 'count': 1},
+            ],
+            'category': [
+                {'value': 'books', 'count': 1},
+                {'value': 'films', 'count': 1},
+            ],
+            'year': [
+                {'value': 1984, 'count': 1},
+                {'value': 1988, 'count': 1},
+            ],
+        }, (
+            'Проверьте, что `facets` возвращает число произведений для '
+            'каждого значения фасета.'
+        )
+        assert 'facets' not in self.get_facets(client), (
+            'Проверьте, что без параметра `facets` счётчики не считаются.'
+        )
+
+    def test_02_facets_ignore_own_filter(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_titles(admin_client)
+        with django_assert_num_queries(4 + 2):
+            data = self.get_facets(
+                client, genre='drama', facets='genre,category'
+            )
+        assert [title['name'] for title in data['results']] == [
+            'Крепкий орешек'
+        ]
+        assert [row['value'] for row in data['facets']['genre']] == [
+            'comedy', 'drama', 'horror'
+        ], (
+            'Проверьте, что фасет не учитывает собственный фильтр.'
+        )
+        assert data['facets']['category'] == [
+            {'value': 'books', 'count': 1}
+        ], (
+            'Проверьте, что фасет учитывает фильтры по другим полям.'
+        )
+
+    def test_03_unknown_facet(self, client):
+        response = client.get(self.TITLES_URL, {'facets': 'author'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестный фасет возвращает ответ со '
+            'статусом 400.'
+        )
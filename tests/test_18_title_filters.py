@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_range_filters(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 8)
+        assert self.names(client, year_min=1985) == ['Крепкий орешек']
+        assert self.names(client, year_max=1985) == ['Терминатор']
+        assert self.names(client, year_min=1984, year_max=1988) == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что `year_min` и `year_max` включают границы.'
+        )
+        assert self.names(client, rating_min=7) == ['Терминатор']
+        assert self.names(client, rating_max=7) == [], (
+            'Проверьте, что произведения без оценок не попадают в '
+            'диапазон рейтинга.'
+        )
+
+    def test_02_genre_in(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, genre__in='horror,drama') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что `genre__in` отбирает произведения с любым из '
+            'перечисленных жанров без повторов.'
+        )
+        assert self.names(
+            client, genre__in='horror,comedy', genre_match='all'
+        ) == ['Терминатор']
+        assert self.names(
+            client, genre__in='horror,drama', genre_match='all'
+        ) == [], (
+            'Проверьте, что при `genre_match=all` произведение должно '
+            'иметь все перечисленные жанры.'
+        )
+        response = client.get(self.TITLES_URL, {'genre_match': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_ordering(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'text', 3)
+        assert self.names(client, ordering='year') == [
+            'Терминатор', 'Крепкий орешек'
+        ]
+        assert self.names(client, ordering='-year') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.names(client, ordering='name') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.names(client, ordering='-rating', rating_min=1) == [
+            'Крепкий орешек'
+        ], (
+            'Проверьте, что параметр `ordering` сортирует по рейтингу, '
+            'году и имени.'
+        )
+
+    def test_04_facets_ignore_own_params(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, {
+            'genre__in': 'drama', 'genre_match': 'all', 'year_min': 1985,
+            'facets': 'genre,year'
+        })
+        facets = response.json()['facets']
+        assert [row['value'] for row in facets['genre']] == ['drama']
+        assert [row['value'] for row in facets['year']] == [1988]
+        response = client.get(self.TITLES_URL, {
+            'genre__in': 'drama', 'facets': 'genre'
+        })
+        assert len(response.json()['facets']['genre']) == 3, (
+            'Проверьте, что фасет не учитывает фильтры по своему полю.'
+        )
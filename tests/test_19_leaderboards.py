@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import LeaderboardEntry
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Leaderboards:
+
+    LEADERBOARD_URL = '/api/v1/leaderboards/{board}/'
+
+    def board(self, client, board, **params):
+        url = self.LEADERBOARD_URL.format(board=board)
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [
+            (entry['rank'], entry['title']['name'], entry['value'])
+            for entry in response.json()['results']
+        ]
+
+    def create_data(self, admin_client, user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 4)
+        create_single_review(moderator_client, titles[0]['id'], 'text', 6)
+        create_single_review(user_client, titles[1]['id'], 'text', 9)
+        return titles
+
+    def test_01_boards_and_scopes(self, client, admin_client, user_client,
+                                  moderator_client,
+                                  django_assert_num_queries):
+        self.create_data(admin_client, user_client, moderator_client)
+        with django_assert_num_queries(2):
+            assert self.board(client, 'rating') == [
+                (1, 'Крепкий орешек', 9), (2, 'Терминатор', 5)
+            ], (
+                'Проверьте, что рейтинг `rating` упорядочен по средней '
+                'оценке.'
+            )
+        assert self.board(client, 'reviews') == [
+            (1, 'Терминатор', 2), (2, 'Крепкий орешек', 1)
+        ]
+        assert self.board(client, 'rating', genre='horror') == [
+            (1, 'Терминатор', 5)
+        ]
+        assert self.board(client, 'rating', category='books') == [
+            (1, 'Крепкий орешек', 9)
+        ]
+        assert self.board(client, 'rating', year=1984) == [
+            (1, 'Терминатор', 5)
+        ]
+        assert self.board(client, 'rating', limit=1) == [
+            (1, 'Крепкий орешек', 9)
+        ]
+        url = self.LEADERBOARD_URL.format(board='rating')
+        assert client.get(
+            url, {'genre': 'horror', 'year': 1984}
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(
+            url, {'genre': 'unknown'}
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(
+            self.LEADERBOARD_URL.format(board='unknown')
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_incremental_refresh(self, client, admin_client, user_client,
+                                    moderator_client):
+        titles = self.create_data(admin_client, user_client, moderator_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'genre': ['drama'], 'category': 'books'}
+        )
+        assert self.board(client, 'rating', genre='horror') == []
+        assert [row[1] for row in self.board(
+            client, 'rating', category='books'
+        )] == ['Крепкий орешек', 'Терминатор'], (
+            'Проверьте, что рейтинги обновляются при изменении жанров и '
+            'категории произведения.'
+        )
+        review_id = client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        ).json()['results'][0]['id']
+        user_client.delete(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{review_id}/'
+        )
+        assert self.board(client, 'rating') == [(1, 'Терминатор', 5)], (
+            'Проверьте, что рейтинги обновляются при удалении отзыва.'
+        )
+        snapshot = set(LeaderboardEntry.objects.values_list(
+            'board', 'scope', 'scope_id', 'title_id', 'value'
+        ))
+        call_command('rebuild_leaderboards')
+        assert set(LeaderboardEntry.objects.values_list(
+            'board', 'scope', 'scope_id', 'title_id', 'value'
+        )) == snapshot, (
+            'Проверьте, что команда `rebuild_leaderboards` даёт те же '
+            'записи, что и инкрементальное обновление.'
+        )
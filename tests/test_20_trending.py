@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import Review, Title
+from reviews.trending import add_activity, current_score
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Trending:
+
+    TRENDING_URL = '/api/v1/titles/trending/'
+
+    def trending(self, client, **params):
+        response = client.get(self.TRENDING_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TRENDING_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()['results']
+
+    def test_01_activity_order(self, client, admin_client, user_client,
+                               moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.trending(client) == [], (
+            'Проверьте, что произведения без активности не попадают в '
+            'список популярных.'
+        )
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 5
+        ).json()
+        create_single_review(moderator_client, titles[1]['id'], 'text', 5)
+        create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'comment'
+        )
+        results = self.trending(client)
+        assert [title['name'] for title in results] == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что комментарии увеличивают популярность '
+            'произведения.'
+        )
+        expected = (
+            settings.TRENDING_REVIEW_WEIGHT
+            + settings.TRENDING_COMMENT_WEIGHT
+        )
+        assert results[0]['trending'] == pytest.approx(expected, rel=1e-3)
+        assert [title['name'] for title in self.trending(
+            client, genre='drama'
+        )] == ['Крепкий орешек'], (
+            'Проверьте, что список популярных принимает фильтры списка '
+            'произведений.'
+        )
+
+    def test_02_decay_and_rebuild(self, client, admin_client, user_client,
+                                  moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 5)
+        create_single_review(moderator_client, titles[1]['id'], 'text', 5)
+        Review.objects.filter(title_id=titles[0]['id']).update(
+            pub_date=timezone.now() - settings.TRENDING_HALF_LIFE * 2
+        )
+        call_command('rebuild_trending')
+        results = self.trending(client)
+        assert [title['name'] for title in results] == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что старая активность затухает и команда '
+            '`rebuild_trending` пересчитывает счётчики по истории.'
+        )
+        assert results[1]['trending'] == pytest.approx(0.25, rel=1e-3)
+        Review.objects.get(title_id=titles[1]['id']).delete()
+        assert Title.objects.get(pk=titles[1]['id']).trending_score is None, (
+            'Проверьте, что удаление отзыва вычитает его вклад без '
+            'остатка.'
+        )
+        Title.objects.filter(pk=titles[0]['id']).update(trending_score=None)
+        call_command('rebuild_trending')
+        assert Title.objects.get(pk=titles[0]['id']).trending_score is not None
+
+    def test_03_scores_do_not_overflow(self, client, admin_client,
+                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        far_future = settings.TRENDING_EPOCH + (
+            settings.TRENDING_HALF_LIFE * 5000
+        )
+        title = Title.objects.filter(pk=titles[0]['id'])
+        add_activity(title, far_future, 1.0)
+        add_activity(title, far_future, 0.5)
+        assert current_score(
+            title.get().trending_score, far_future
+        ) == pytest.approx(1.5), (
+            'Проверьте, что счётчик популярности не переполняется через '
+            'тысячи периодов полураспада после эпохи.'
+        )
+        add_activity(title, far_future, -1.0)
+        add_activity(title, far_future, -0.5)
+        assert title.get().trending_score is None
+        review = create_single_review(
+            user_client, titles[1]['id'], 'text', 5
+        ).json()
+        create_single_comment(
+            user_client, titles[1]['id'], review['id'], 'comment'
+        )
+        Review.objects.get(pk=review['id']).delete()
+        assert self.trending(client) == [], (
+            'Проверьте, что после удаления всей активности произведение '
+            'не остаётся в списке популярных.'
+        )
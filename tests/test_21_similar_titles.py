@@ -0,0 +1,161 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import SimilarTitle, SimilarTitleUpdate
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21SimilarTitles:
+
+    SIMILAR_URL = '/api/v1/titles/{title_id}/similar/'
+
+    def similar(self, client, title_id):
+        url = self.SIMILAR_URL.format(title_id=title_id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [
+            (entry['title']['name'], entry['score'])
+            for entry in response.json()['results']
+        ]
+
+    def create_data(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой', 'year': 1979, 'genre': ['horror'],
+            'category': 'films'
+        })
+        titles.append(response.json())
+        return titles
+
+    def test_01_similar_by_reviews_and_genres(self, client, admin_client,
+                                              user_client, moderator_client,
+                                              django_assert_num_queries):
+        titles = self.create_data(admin_client)
+        for author_client in (user_client, moderator_client):
+            create_single_review(author_client, titles[1]['id'], 'text', 7)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        create_single_review(moderator_client, titles[0]['id'], 'text', 7)
+        call_command('refresh_similar_titles')
+        with django_assert_num_queries(2):
+            similar = self.similar(client, titles[0]['id'])
+        assert [name for name, _ in similar] == [
+            'Крепкий орешек', 'Чужой'
+        ], (
+            'Проверьте, что похожие произведения упорядочены по числу '
+            'общих авторов отзывов и общих жанров.'
+        )
+        assert similar[0][1] == pytest.approx(1.0)
+        assert similar[1][1] == pytest.approx(0.25)
+        assert self.similar(client, titles[2]['id']) == [
+            ('Терминатор', pytest.approx(0.25))
+        ]
+        response = client.get(self.SIMILAR_URL.format(title_id=999))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_incremental_matches_rebuild(self, client, admin_client,
+                                            user_client, moderator_client,
+                                            settings):
+        settings.SIMILAR_TITLES_REBUILD_SHARE = 1
+        titles = self.create_data(admin_client)
+        call_command('rebuild_similar_titles')
+        create_single_review(user_client, titles[1]['id'], 'text', 7)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'genre': ['drama']}
+        )
+        call_command('refresh_similar_titles')
+        assert [name for name, _ in self.similar(
+            client, titles[0]['id']
+        )] == ['Крепкий орешек'], (
+            'Проверьте, что похожие произведения обновляются при '
+            'изменении жанров.'
+        )
+        rows = set(SimilarTitle.objects.values_list(
+            'title_id', 'similar_id', 'score'
+        ))
+        call_command('rebuild_similar_titles')
+        assert set(SimilarTitle.objects.values_list(
+            'title_id', 'similar_id', 'score'
+        )) == rows, (
+            'Проверьте, что команда `rebuild_similar_titles` и '
+            'инкрементальное обновление дают одинаковый результат.'
+        )
+        assert [name for name, _ in self.similar(
+            client, titles[1]['id']
+        )] == ['Терминатор']
+
+    def test_03_review_only_queues_refresh(self, client, admin_client,
+                                           user_client, settings):
+        settings.SIMILAR_TITLES_REBUILD_SHARE = 1
+        titles = self.create_data(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'text', 7)
+        call_command('refresh_similar_titles')
+        assert 'Крепкий орешек' not in dict(
+            self.similar(client, titles[0]['id'])
+        )
+        with CaptureQueriesContext(connection) as context:
+            create_single_review(user_client, titles[0]['id'], 'text', 7)
+        assert not any(
+            f'"{SimilarTitle._meta.db_table}"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что создание отзыва не пересчитывает похожие '
+            'произведения в запросе, а только ставит их в очередь.'
+        )
+        assert SimilarTitleUpdate.objects.exists()
+        call_command('refresh_similar_titles')
+        assert not SimilarTitleUpdate.objects.exists(), (
+            'Проверьте, что команда `refresh_similar_titles` очищает '
+            'обработанную очередь.'
+        )
+        assert 'Крепкий орешек' in dict(self.similar(client, titles[0]['id']))
+        assert 'Терминатор' in dict(self.similar(client, titles[1]['id'])), (
+            'Проверьте, что пересчёт обновляет списки похожих обеих '
+            'сторон пары.'
+        )
+
+    def test_04_genre_candidates_capped(self, client, admin_client,
+                                        user_client, settings):
+        settings.SIMILAR_GENRE_CANDIDATES = 1
+        settings.SIMILAR_TITLES_REBUILD_SHARE = 1
+        titles = self.create_data(admin_client)
+        for name in ('Хэллоуин', 'Нечто'):
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': name, 'year': 1980, 'genre': ['horror'],
+                'category': 'films'
+            })
+            titles.append(response.json())
+        create_single_review(user_client, titles[2]['id'], 'text', 7)
+        call_command('rebuild_similar_titles')
+        assert [name for name, _ in self.similar(
+            client, titles[4]['id']
+        )] == ['Чужой'], (
+            'Проверьте, что близость по жанрам считается только с первыми '
+            '`SIMILAR_GENRE_CANDIDATES` произведениями жанра по числу '
+            'отзывов.'
+        )
+        assert self.similar(client, titles[2]['id']) == []
+        create_single_review(user_client, titles[3]['id'], 'text', 7)
+        call_command('refresh_similar_titles')
+        assert [name for name, _ in self.similar(
+            client, titles[2]['id']
+        )] == ['Хэллоуин']
+        rows = set(SimilarTitle.objects.values_list(
+            'title_id', 'similar_id', 'score'
+        ))
+        call_command('rebuild_similar_titles')
+        assert set(SimilarTitle.objects.values_list(
+            'title_id', 'similar_id', 'score'
+        )) == rows, (
+            'Проверьте, что команда `rebuild_similar_titles` и '
+            'инкрементальное обновление дают одинаковый результат.'
+        )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ScoreDistribution:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def distribution(self, client, title_id):
+        response = client.get(f'{self.TITLES_URL}{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'distribution' in response.json(), (
+            'Проверьте, что детальный ответ произведения содержит поле '
+            '`distribution`.'
+        )
+        return response.json()['distribution']
+
+    def test_01_detail_distribution(self, client, admin_client, user_client,
+                                    moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.distribution(client, title_id) == {
+            'count': 0,
+            'mean': None,
+            'median': None,
+            'histogram': {str(score): 0 for score in range(1, 11)},
+        }
+        create_single_review(user_client, title_id, 'text', 3)
+        review = create_single_review(
+            moderator_client, title_id, 'text', 8
+        ).json()
+        distribution = self.distribution(client, title_id)
+        assert distribution['count'] == 2
+        assert distribution['mean'] == 5.5
+        assert distribution['median'] == 5.5
+        assert distribution['histogram']['3'] == 1, (
+            'Проверьте, что гистограмма оценок обновляется при создании '
+            'отзыва.'
+        )
+        moderator_client.patch(
+            f'{self.TITLES_URL}{title_id}/reviews/{review["id"]}/',
+            data={'score': 3}
+        )
+        distribution = self.distribution(client, title_id)
+        assert distribution['histogram']['3'] == 2
+        assert distribution['histogram']['8'] == 0, (
+            'Проверьте, что гистограмма оценок обновляется при изменении '
+            'оценки.'
+        )
+        assert distribution['median'] == 3
+
+    def test_02_list_fields_and_rebuild(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 10)
+        results = client.get(self.TITLES_URL).json()['results']
+        assert 'distribution' not in results[0], (
+            'Проверьте, что список произведений не содержит '
+            '`distribution` без параметра `fields`.'
+        )
+        results = client.get(
+            self.TITLES_URL, {'fields': 'distribution'}
+        ).json()['results']
+        assert results[0]['distribution']['histogram']['10'] == 1
+        Title.objects.update(score_10_count=0)
+        call_command('rebuild_ratings')
+        assert Title.objects.get(pk=titles[0]['id']).score_histogram[10] == 1
+        Review.objects.get().delete()
+        assert Title.objects.get(
+            pk=titles[0]['id']
+        ).score_histogram[10] == 0, (
+            'Проверьте, что гистограмма оценок обновляется при удалении '
+            'отзыва.'
+        )
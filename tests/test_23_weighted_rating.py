@@ -0,0 +1,71 @@
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23WeightedRating:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def expected(self, rating_sum, rating_count):
+        prior_votes = settings.RATING_MIN_VOTES
+        return (
+            (rating_sum + prior_votes * settings.RATING_PRIOR_MEAN)
+            / (rating_count + prior_votes)
+        )
+
+    def test_01_weighted_rating_ordering(self, client, admin_client,
+                                         user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        assert Title.objects.get(
+            pk=titles[0]['id']
+        ).weighted_rating == settings.RATING_PRIOR_MEAN, (
+            'Проверьте, что взвешенный рейтинг произведения без оценок '
+            'равен априорному среднему.'
+        )
+        create_single_review(user_client, titles[0]['id'], 'text', 10)
+        for author_client in (user_client, moderator_client, admin_client):
+            create_single_review(author_client, titles[1]['id'], 'text', 9)
+        assert Title.objects.get(
+            pk=titles[1]['id']
+        ).weighted_rating == pytest.approx(self.expected(27, 3))
+        names = [
+            title['name'] for title in client.get(
+                self.TITLES_URL, {'ordering': '-weighted_rating'}
+            ).json()['results']
+        ]
+        assert names == ['Крепкий орешек', 'Терминатор'], (
+            'Проверьте, что сортировка `ordering=-weighted_rating` '
+            'учитывает число оценок.'
+        )
+        names = [
+            title['name'] for title in client.get(
+                self.TITLES_URL, {'ordering': '-rating'}
+            ).json()['results']
+        ]
+        assert names == ['Терминатор', 'Крепкий орешек']
+
+    def test_02_rebuild_and_index(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 2)
+        Title.objects.update(weighted_rating=0)
+        call_command('rebuild_ratings')
+        assert Title.objects.get(
+            pk=titles[0]['id']
+        ).weighted_rating == pytest.approx(self.expected(2, 1)), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'взвешенный рейтинг.'
+        )
+        query = str(Title.objects.order_by('-weighted_rating')[:10].query)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'title_weighted_rating_idx' in plan, (
+            'Проверьте, что сортировка по взвешенному рейтингу использует '
+            'индекс.'
+        )
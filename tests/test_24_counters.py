@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Counters:
+
+    def test_01_counters_in_responses(self, client, admin_client,
+                                      user_client, moderator_client,
+                                      user, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        title_id = titles[0]['id']
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['reviews_count'] == 2, (
+            'Проверьте, что ответ произведения содержит поле '
+            '`reviews_count`.'
+        )
+        url = f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        assert client.get(url).json()['comments_count'] == 2, (
+            'Проверьте, что ответ отзыва содержит поле `comments_count`.'
+        )
+        user_client.delete(f'{url}comments/{comments[0]["id"]}/')
+        assert client.get(url).json()['comments_count'] == 1, (
+            'Проверьте, что `comments_count` уменьшается при удалении '
+            'комментария.'
+        )
+
+    def test_02_comment_changes_reviews_etag(self, client, admin_client,
+                                             user_client, moderator_client,
+                                             user, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review_url = f'{url}{reviews[0]["id"]}/'
+        etags = {
+            address: client.get(address)['ETag']
+            for address in (url, review_url)
+        }
+        user_client.delete(f'{review_url}comments/{comments[0]["id"]}/')
+        for address, etag in etags.items():
+            response = client.get(address, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что удаление комментария меняет ETag '
+                f'`{address}`: в ответе меняется `comments_count`.'
+            )
+        response = client.get(url)
+        assert sorted(
+            review['comments_count'] for review in response.json()['results']
+        ) == [0, 1]
+        user_client.post(f'{review_url}comments/', data={'text': 'text'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов.'
+        )
+
+    def test_03_check_and_repair(self, admin_client, user_client,
+                                 moderator_client, user, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        create_comments(admin_client, authors_map)
+        call_command('check_counters')
+        Review.objects.update(comments_count=7)
+        Title.objects.update(rating_count=0)
+        with pytest.raises(CommandError):
+            call_command('check_counters')
+        call_command('check_counters', repair=True)
+        call_command('check_counters')
+        assert sorted(
+            Review.objects.values_list('comments_count', flat=True)
+        ) == [0, 2], (
+            'Проверьте, что `check_counters --repair` восстанавливает '
+            'счётчики.'
+        )
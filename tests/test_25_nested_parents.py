@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25NestedParents:
+
+    def test_01_comment_parent_lookup(self, admin_client, user_client,
+                                      user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'comment'})
+        assert response.status_code == HTTPStatus.CREATED
+        parent_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and ('FROM "reviews_review"' in query['sql']
+                 or 'FROM "reviews_title"' in query['sql'])
+        ]
+        assert len(parent_queries) == 1, (
+            'Проверьте, что произведение и отзыв из URL проверяются одним '
+            'запросом за запрос к API.\n' + '\n'.join(parent_queries)
+        )
+        response = user_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/',
+            data={'text': 'comment'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзыв другого произведения не найден.'
+        )
@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26DuplicateReview:
+
+    def test_01_constraint_rejects_duplicate(self, admin_client,
+                                             user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'text', 'score': 5}
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        prechecks = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"reviews_review"."author_id" =' in query['sql']
+        ]
+        assert not prechecks, (
+            'Проверьте, что повторный отзыв отсекается ограничением базы, '
+            'а не предварительным запросом.\n' + '\n'.join(prechecks)
+        )
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': [
+                'You cannot write more than one review on the same title'
+            ]
+        }
+        assert Review.objects.count() == 1
+        response = user_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/', data=data
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что после отклонённого отзыва можно оставить отзыв '
+            'на другое произведение.'
+        )
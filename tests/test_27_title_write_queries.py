@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_slug_cache
+from reviews.models import Category, Genre, TitleGenre
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleWriteQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES = 20
+
+    def catalogue_queries(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and ('FROM "reviews_genre"' in query['sql']
+                 or 'FROM "reviews_category"' in query['sql'])
+        ]
+
+    def post_title(self, admin_client, name, genres):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': name, 'year': 2000, 'genre': genres,
+                'category': 'films'
+            })
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        return response.json(), self.catalogue_queries(context)
+
+    def test_01_slugs_resolved_in_batch(self, admin_client):
+        create_categories(admin_client)
+        slugs = [f'genre-{idx}' for idx in range(self.GENRES)]
+        Genre.objects.bulk_create(
+            Genre(name=slug, slug=slug) for slug in slugs
+        )
+        title, queries = self.post_title(admin_client, 'Первое', slugs)
+        assert len(queries) <= 3, (
+            'Проверьте, что жанры и категория произведения разрешаются '
+            'одним запросом на справочник.\n' + '\n'.join(queries)
+        )
+        assert sorted(genre['slug'] for genre in title['genre']) == sorted(
+            slugs
+        )
+        assert TitleGenre.objects.filter(title_id=title['id']).count() == (
+            self.GENRES
+        )
+        _, queries = self.post_title(admin_client, 'Второе', slugs)
+        assert len(queries) <= 1, (
+            'Проверьте, что повторная запись использует кэш slug.\n'
+            + '\n'.join(queries)
+        )
+
+    def test_02_update_and_invalidation(self, admin_client):
+        create_categories(admin_client)
+        Genre.objects.bulk_create(
+            Genre(name=slug, slug=slug) for slug in ('a', 'b', 'c')
+        )
+        title, _ = self.post_title(admin_client, 'Первое', ['a', 'b'])
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title["id"]}/', data={'genre': ['b', 'c']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert sorted(
+            TitleGenre.objects.filter(title_id=title['id']).values_list(
+                'genre_id__slug', flat=True
+            )
+        ) == ['b', 'c'], (
+            'Проверьте, что изменение жанров удаляет лишние связи и '
+            'добавляет новые.'
+        )
+        admin_client.delete('/api/v1/genres/c/')
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title["id"]}/', data={'genre': ['c']}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что удаление жанра сбрасывает кэш slug.'
+        )
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Третье', 'year': 2000, 'genre': ['a', 'missing'],
+            'category': 'films'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_stale_slug_cache(self, admin_client):
+        create_categories(admin_client)
+        Genre.objects.bulk_create(
+            Genre(name=slug, slug=slug) for slug in ('drama', 'stale')
+        )
+        Category.objects.create(name='stale', slug='stale')
+        get_slug_cache(Genre).get_many(['drama', 'stale'])
+        get_slug_cache(Category).get_many(['films', 'stale'])
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_genre WHERE slug = %s',
+                           ['stale'])
+            cursor.execute('DELETE FROM reviews_category WHERE slug = %s',
+                           ['stale'])
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Первое', 'year': 2000, 'genre': ['drama', 'stale'],
+            'category': 'films'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что жанр, удалённый после попадания в кэш slug, '
+            'приводит к ответу со статусом 400, а не к ошибке сервера.'
+        )
+        assert list(response.json()) == ['genre'], response.json()
+        title, _ = self.post_title(admin_client, 'Второе', ['drama'])
+        Category.objects.create(name='stale', slug='stale')
+        get_slug_cache(Category).get_many(['stale'])
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_category WHERE slug = %s',
+                           ['stale'])
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title["id"]}/', data={'category': 'stale'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что категория, удалённая после попадания в кэш '
+            'slug, приводит к ответу со статусом 400 при изменении '
+            'произведения.'
+        )
+        assert list(response.json()) == ['category'], response.json()
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Третье', 'year': 2000, 'genre': ['drama'],
+            'category': 'stale'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert TitleGenre.objects.count() == 1
@@ -0,0 +1,191 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_slug_cache
+from reviews.models import Category, Genre, Title, TitleGenre
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28BulkTitles:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+    TITLES = 60
+
+    def prepare(self, admin_client):
+        create_categories(admin_client)
+        Genre.objects.bulk_create(
+            Genre(name=slug, slug=slug) for slug in ('drama', 'comedy')
+        )
+
+    def post_json(self, client, items):
+        return client.post(
+            self.BULK_URL, data=json.dumps(items),
+            content_type='application/json'
+        )
+
+    def test_01_json_array(self, admin_client):
+        self.prepare(admin_client)
+        existing = Title.objects.create(
+            name='Старое', year=1990,
+            category=Category.objects.get(slug='books')
+        )
+        response = self.post_json(admin_client, [
+            {'name': 'Первое', 'year': 2000, 'genre': ['drama'],
+             'category': 'films'},
+            {'id': existing.pk, 'name': 'Новое', 'genre': ['comedy']},
+            {'name': 'Без года', 'genre': ['drama'], 'category': 'films'},
+            {'name': 'Чужой жанр', 'year': 2000, 'genre': ['missing'],
+             'category': 'films'},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+            'не объект',
+        ])
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        data = response.json()
+        assert [item['status'] for item in data['results']] == [
+            'created', 'updated', 'error', 'error', 'error', 'error'
+        ], (
+            'Проверьте, что массовая загрузка возвращает результат по каждой '
+            'записи и не прерывается на ошибочных записях.'
+        )
+        assert (data['created'], data['updated'], data['errors']) == (
+            1, 1, 4
+        )
+        assert 'year' in data['results'][2]['errors']
+        assert 'genre' in data['results'][3]['errors']
+        assert 'titles_per_second' in data
+        created = Title.objects.get(pk=data['results'][0]['id'])
+        assert created.category.slug == 'films'
+        assert list(created.genre.values_list('slug', flat=True)) == [
+            'drama'
+        ]
+        existing.refresh_from_db()
+        assert (existing.name, existing.year, existing.category.slug) == (
+            'Новое', 1990, 'books'
+        ), (
+            'Проверьте, что записи с `id` изменяются частично.'
+        )
+        assert list(existing.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ]
+
+    def test_02_ndjson_stream(self, admin_client):
+        self.prepare(admin_client)
+        lines = [
+            json.dumps({'name': f'Фильм {idx}', 'year': 2000,
+                        'genre': ['drama'], 'category': 'films'})
+            for idx in range(3)
+        ]
+        response = admin_client.post(
+            self.BULK_URL, data='\n'.join(lines) + '\n\n',
+            content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        assert response.json()['created'] == 3, (
+            'Проверьте, что эндпоинт принимает поток NDJSON.'
+        )
+        response = admin_client.post(
+            self.BULK_URL, data=lines[0] + '\n{oops',
+            content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'line 2' in response.json()['detail']
+        response = self.post_json(admin_client, {'name': 'Не список'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_admin_only(self, client, user_client, moderator_client):
+        item = [{'name': 'Фильм', 'year': 2000}]
+        assert self.post_json(client, item).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        for forbidden in (user_client, moderator_client):
+            assert self.post_json(forbidden, item).status_code == (
+                HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что массовая загрузка доступна только админу.'
+        assert not Title.objects.exists()
+
+    def test_04_hooks(self, admin_client):
+        self.prepare(admin_client)
+        title = Title.objects.create(
+            name='Старое', year=1990,
+            category=Category.objects.get(slug='books')
+        )
+        assert admin_client.get(f'/api/v1/titles/{title.pk}/').json()[
+            'genre'
+        ] == []
+        assert admin_client.get('/api/v1/autocomplete/?q=стар').json()[
+            'titles'
+        ]
+        response = self.post_json(admin_client, [
+            {'id': title.pk, 'name': 'Обновлённое', 'genre': ['drama']},
+        ])
+        assert response.status_code == HTTPStatus.OK, response.json()
+        detail = admin_client.get(f'/api/v1/titles/{title.pk}/').json()
+        assert detail['name'] == 'Обновлённое', (
+            'Проверьте, что массовая загрузка сбрасывает кэш произведений.'
+        )
+        assert [genre['slug'] for genre in detail['genre']] == ['drama']
+        suggestions = admin_client.get(
+            '/api/v1/autocomplete/?q=обнов'
+        ).json()
+        assert [item['id'] for item in suggestions['titles']] == [
+            title.pk
+        ], 'Проверьте, что массовая загрузка обновляет автодополнение.'
+
+    def test_05_queries_per_chunk(self, admin_client, settings):
+        self.prepare(admin_client)
+        settings.BULK_TITLES_CHUNK_SIZE = 20
+        items = [
+            {'name': f'Фильм {idx}', 'year': 2000,
+             'genre': ['drama', 'comedy'], 'category': 'films'}
+            for idx in range(self.TITLES)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_json(admin_client, items)
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        assert TitleGenre.objects.count() == 2 * self.TITLES
+        genre_inserts = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_titlegenre"')
+        ]
+        assert len(genre_inserts) == self.TITLES // 20, (
+            'Проверьте, что связи с жанрами создаются одним запросом на '
+            'пачку.'
+        )
+        catalogue = [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_genre"' in query['sql']
+            and query['sql'].startswith('SELECT')
+        ]
+        assert len(catalogue) <= 2, '\n'.join(catalogue)
+
+    def test_06_stale_slug_fails_only_its_item(self, admin_client):
+        self.prepare(admin_client)
+        Genre.objects.create(name='stale', slug='stale')
+        get_slug_cache(Genre).get_many(['drama', 'stale'])
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_genre WHERE slug = %s',
+                           ['stale'])
+        response = self.post_json(admin_client, [
+            {'name': 'Первое', 'year': 2000, 'genre': ['drama'],
+             'category': 'films'},
+            {'name': 'Устаревшее', 'year': 2000, 'genre': ['stale'],
+             'category': 'films'},
+            {'name': 'Второе', 'year': 2000, 'genre': ['drama'],
+             'category': 'films'},
+        ])
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        results = response.json()['results']
+        assert [item['status'] for item in results] == [
+            'created', 'error', 'created'
+        ], (
+            'Проверьте, что жанр, удалённый после попадания в кэш slug, '
+            'даёт ошибку только своей записи, а остальные записи пачки '
+            'сохраняются.'
+        )
+        assert list(results[1]['errors']) == ['genre']
+        assert Title.objects.count() == 2
@@ -304,3 +304,35 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def collect_router_routes(router):
+    """Возвращает GET-маршруты роутера (без api-root) и их аргументы."""
+    routes = {}
+    for pattern in router.urls:
+        name = pattern.name
+        actions = getattr(pattern.callback, 'actions', {})
+        if (
+            name is None
+            or name == router.root_view_name
+            or 'get' not in actions
+            or 'format' in pattern.pattern.regex.groupindex
+        ):
+            continue
+        routes[name] = tuple(pattern.pattern.regex.groupindex)
+    return routes
+
+
+def count_route_queries(client, route_name, route_kwargs):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    url = reverse(route_name, kwargs=route_kwargs)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос администратора к `{url}` возвращает '
+        'ответ со статусом 200.'
+    )
+    return url, [query['sql'] for query in context.captured_queries]